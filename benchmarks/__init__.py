@@ -0,0 +1,5 @@
+"""Benchmarks; see the README for the load benchmark workflow."""
+
+# Shared by the seed script and the load generator.
+USERNAME_PREFIX = "bench_user_"
+PASSWORD = "bench-password"
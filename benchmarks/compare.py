@@ -0,0 +1,68 @@
+"""
+Compare two benchmarks.load reports.
+
+Prints the change of throughput and p50/p95/p99 per scenario as JSON and
+exits with status 1 when any percentile got slower, or throughput lower,
+by more than the threshold:
+
+    python -m benchmarks.compare before.json after.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def change(before: float, after: float) -> float | None:
+    """Relative change in percent."""
+    if not before:
+        return None
+    return round((after - before) / before * 100, 2)
+
+
+def compare(before: dict, after: dict, threshold: float) -> tuple[dict, list[str]]:
+    """Per-scenario changes and the list of regressions."""
+    report = {}
+    regressions = []
+    for scenario in sorted(set(before["scenarios"]) & set(after["scenarios"])):
+        old, new = before["scenarios"][scenario], after["scenarios"][scenario]
+        entry = {}
+        for key in (*LATENCY_KEYS, "throughput_rps"):
+            delta = change(old[key], new[key])
+            entry[key] = {"before": old[key], "after": new[key], "change_pct": delta}
+            if delta is None:
+                continue
+            slower = delta > threshold if key in LATENCY_KEYS else -delta > threshold
+            if slower:
+                regressions.append(f"{scenario}.{key} {delta:+.2f}%")
+        entry["errors"] = {"before": old["errors"], "after": new["errors"]}
+        report[scenario] = entry
+    return report, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args()
+    with open(args.before) as file:
+        before = json.load(file)
+    with open(args.after) as file:
+        after = json.load(file)
+    report, regressions = compare(before, after, args.threshold)
+    print(
+        json.dumps(
+            {
+                "before": before["meta"].get("git_revision"),
+                "after": after["meta"].get("git_revision"),
+                "threshold_pct": args.threshold,
+                "scenarios": report,
+                "regressions": regressions,
+            },
+            indent=2,
+        )
+    )
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,244 @@
+"""
+Drive the running API with concurrent virtual users and report latency.
+
+Every virtual user logs in as its own seeded bench user (see
+benchmarks.seed) and then runs the selected scenarios in a weighted random
+mix until the duration is over. The report is JSON with throughput and
+p50/p95/p99 per scenario:
+
+    python -m benchmarks.load --base-url http://localhost:8000 \\
+        --concurrency 20 --duration 60 --output before.json
+
+Requires the 'bench' extra (httpx).
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks import PASSWORD, USERNAME_PREFIX
+
+
+SEARCH_QUERIES = ("ann", "smith", "ola", "ivan", "example", "zzz")
+
+SCENARIO_WEIGHTS = {
+    "contacts": 40,
+    "search": 25,
+    "birthdays": 20,
+    "refresh": 10,
+    "login": 5,
+}
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class VirtualUser:
+    """One logged-in client running scenarios."""
+    def __init__(self, client: httpx.AsyncClient, username: str):
+        self.client = client
+        self.username = username
+        self.access_token = ""
+        self.refresh_token = ""
+        self.cursor: str | None = None
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+    async def login(self) -> httpx.Response:
+        response = await self.client.post(
+            "/api/users/login",
+            data={"username": self.username, "password": PASSWORD},
+        )
+        if response.status_code == 200:
+            self._store_tokens(response.json())
+        return response
+
+    async def refresh(self) -> httpx.Response:
+        response = await self.client.post(
+            "/api/users/refresh", json={"refresh_token": self.refresh_token}
+        )
+        if response.status_code == 200:
+            self._store_tokens(response.json())
+        return response
+
+    async def contacts(self) -> httpx.Response:
+        params = {"limit": 50}
+        if self.cursor:
+            params["after"] = self.cursor
+        response = await self.client.get(
+            "/api/contacts/", params=params, headers=self.headers
+        )
+        self.cursor = response.headers.get("X-Next-Cursor")
+        return response
+
+    async def search(self) -> httpx.Response:
+        return await self.client.get(
+            "/api/contacts/search/",
+            params={"query": random.choice(SEARCH_QUERIES), "limit": 20},
+            headers=self.headers,
+        )
+
+    async def birthdays(self) -> httpx.Response:
+        return await self.client.get(
+            "/api/contacts/upcoming_birthdays/", headers=self.headers
+        )
+
+    def _store_tokens(self, body: dict) -> None:
+        self.access_token = body["access_token"]
+        self.refresh_token = body["refresh_token"]
+
+
+class Recorder:
+    """Latencies and errors per scenario."""
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    def record(self, scenario: str, seconds: float, ok: bool) -> None:
+        self.latencies.setdefault(scenario, []).append(seconds * 1000)
+        if not ok:
+            self.errors[scenario] = self.errors.get(scenario, 0) + 1
+
+    def summary(self, elapsed: float) -> dict:
+        report = {}
+        for scenario, values in sorted(self.latencies.items()):
+            values.sort()
+            report[scenario] = {
+                "requests": len(values),
+                "errors": self.errors.get(scenario, 0),
+                "throughput_rps": round(len(values) / elapsed, 2),
+                "p50_ms": round(percentile(values, 0.50), 3),
+                "p95_ms": round(percentile(values, 0.95), 3),
+                "p99_ms": round(percentile(values, 0.99), 3),
+                "max_ms": round(values[-1], 3),
+            }
+        return report
+
+
+async def run_user(
+    user: VirtualUser,
+    scenarios: list[str],
+    weights: list[int],
+    deadline: float,
+    recorder: Recorder,
+) -> None:
+    """Run scenarios for one virtual user until the deadline."""
+    while time.monotonic() < deadline:
+        scenario = random.choices(scenarios, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = await getattr(user, scenario)()
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        recorder.record(scenario, time.perf_counter() - start, ok)
+
+
+def git_revision() -> str | None:
+    """Current commit of the working tree, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args: argparse.Namespace) -> dict:
+    scenarios = list(args.scenarios)
+    weights = [SCENARIO_WEIGHTS[scenario] for scenario in scenarios]
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        users = [
+            VirtualUser(client, f"{USERNAME_PREFIX}{index % args.users + 1}")
+            for index in range(args.concurrency)
+        ]
+        logins = await asyncio.gather(*(user.login() for user in users))
+        failed = [user.username for user, r in zip(users, logins) if r.status_code != 200]
+        if failed:
+            raise SystemExit(f"Login failed for {failed}; run benchmarks.seed first")
+
+        if args.warmup:
+            await asyncio.gather(
+                *(
+                    run_user(
+                        user, scenarios, weights,
+                        time.monotonic() + args.warmup, Recorder(),
+                    )
+                    for user in users
+                )
+            )
+
+        recorder = Recorder()
+        started = time.monotonic()
+        await asyncio.gather(
+            *(
+                run_user(
+                    user, scenarios, weights, started + args.duration, recorder
+                )
+                for user in users
+            )
+        )
+        elapsed = time.monotonic() - started
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "duration_s": round(elapsed, 3),
+            "warmup_s": args.warmup,
+            "scenarios": dict(zip(scenarios, weights)),
+        },
+        "scenarios": recorder.summary(elapsed),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--users", type=int, default=50,
+        help="number of seeded users; use at least --concurrency so that "
+        "refresh token rotation is not shared between virtual users",
+    )
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIO_WEIGHTS),
+        default=list(SCENARIO_WEIGHTS),
+    )
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+    if args.users < args.concurrency:
+        parser.error("--users must be at least --concurrency")
+    random.seed(args.seed)
+    report = json.dumps(asyncio.run(main(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report + "\n")
+    print(report)
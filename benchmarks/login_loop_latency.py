@@ -0,0 +1,78 @@
+"""
+Measure event loop lag during a burst of bcrypt verifications.
+
+Runs the same login-sized burst twice: once calling bcrypt directly on the
+loop (the old behaviour) and once through the PasswordHasher pool, and
+prints the observed loop lag as JSON:
+
+    python -m benchmarks.login_loop_latency --logins 50
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import bcrypt
+
+from src.core.password_hasher import password_hasher
+
+
+PROBE_INTERVAL = 0.005
+
+
+async def probe_loop_lag(stop: asyncio.Event, lags: list[float]) -> None:
+    """Record how late the loop wakes a periodic sleeper."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+
+async def blocking_verify(password: str, hashed: str) -> bool:
+    """Verify on the event loop thread, as before the pool existed."""
+    return bcrypt.checkpw(password.encode(), hashed.encode())
+
+
+async def pooled_verify(password: str, hashed: str) -> bool:
+    """Verify through the bounded bcrypt pool."""
+    return await password_hasher.verify(password, hashed)
+
+
+async def run_burst(verify, logins: int, password: str, hashed: str) -> dict:
+    """Run a login burst while probing loop lag."""
+    stop = asyncio.Event()
+    lags: list[float] = []
+    probe = asyncio.create_task(probe_loop_lag(stop, lags))
+    await asyncio.sleep(PROBE_INTERVAL * 4)
+    start = time.perf_counter()
+    await asyncio.gather(*(verify(password, hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    lags.sort()
+    return {
+        "logins": logins,
+        "elapsed_s": round(elapsed, 3),
+        "logins_per_s": round(logins / elapsed, 1),
+        "loop_lag_p50_ms": round(statistics.median(lags), 3),
+        "loop_lag_p99_ms": round(lags[int(len(lags) * 0.99) - 1], 3),
+        "loop_lag_max_ms": round(lags[-1], 3),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    password = "benchmark-password"
+    hashed = await password_hasher.hash(password)
+    report = {
+        "bcrypt_rounds": password_hasher.rounds,
+        "blocking": await run_burst(blocking_verify, args.logins, password, hashed),
+        "pooled": await run_burst(pooled_verify, args.logins, password, hashed),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
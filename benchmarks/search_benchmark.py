@@ -0,0 +1,143 @@
+"""
+Compare the legacy ILIKE contact search with the trigram-ranked search.
+
+Seeds a synthetic dataset for a dedicated benchmark user and prints the
+timings as JSON:
+
+    python -m benchmarks.search_benchmark --contacts 1000000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import select, or_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.db import sessionmanager
+from src.entity.models import Contact
+from src.repositories.contacts_repository import ContactRepository
+
+
+BENCH_USERNAME = "bench_search"
+QUERIES = ("ann", "smith", "ola", "example", "zzz")
+
+SEED_USER = text(
+    "INSERT INTO users (username, email, hash_password, role, confirmed) "
+    "VALUES (:username, :email, '!', 'USER', TRUE) "
+    "ON CONFLICT (username) DO UPDATE SET username = EXCLUDED.username "
+    "RETURNING id"
+)
+
+SEED_CONTACTS = text(
+    """
+    INSERT INTO contacts (
+        first_name, last_name, email, birthday, created_at, updated_at, user_id
+    )
+    SELECT
+        (ARRAY['Anna', 'Olaf', 'Maria', 'John', 'Ivan', 'Sofia', 'Petro', 'Lena'])
+            [1 + g % 8] || substr(md5(g::text), 1, 4),
+        (ARRAY['Smith', 'Kovalenko', 'Brown', 'Shevchenko', 'Nolan', 'Garcia'])
+            [1 + g % 6] || substr(md5(g::text), 5, 4),
+        'bench' || g || '@example.com',
+        DATE '1970-01-01' + (g % 18000),
+        now(),
+        now(),
+        :user_id
+    FROM generate_series(:start, :stop) AS g
+    """
+)
+
+
+async def seed(db: AsyncSession, contacts: int, batch: int) -> int:
+    """Seed the benchmark user and contacts, return the user id."""
+    user_id = (
+        await db.execute(
+            SEED_USER,
+            {"username": BENCH_USERNAME, "email": f"{BENCH_USERNAME}@example.com"},
+        )
+    ).scalar_one()
+    existing = (
+        await db.execute(
+            text("SELECT count(*) FROM contacts WHERE user_id = :user_id"),
+            {"user_id": user_id},
+        )
+    ).scalar_one()
+    for start in range(existing + 1, contacts + 1, batch):
+        stop = min(start + batch - 1, contacts)
+        await db.execute(
+            SEED_CONTACTS, {"user_id": user_id, "start": start, "stop": stop}
+        )
+        await db.commit()
+    await db.execute(text("ANALYZE contacts"))
+    await db.commit()
+    return user_id
+
+
+async def legacy_search(db: AsyncSession, query: str, user_id: int) -> int:
+    """The unbounded three-way ILIKE query used before the trigram search."""
+    stmt = (
+        select(Contact)
+        .filter_by(user_id=user_id)
+        .where(
+            or_(
+                Contact.first_name.ilike(f"%{query}%"),
+                Contact.last_name.ilike(f"%{query}%"),
+                Contact.email.ilike(f"%{query}%"),
+            )
+        )
+        .order_by(Contact.id)
+    )
+    result = await db.execute(stmt)
+    return len(result.scalars().unique().all())
+
+
+async def ranked_search(db: AsyncSession, query: str, user_id: int) -> int:
+    """The current ranked and paginated search."""
+    user = SimpleNamespace(id=user_id)
+    contacts = await ContactRepository(db).search_contacts(query, user, 20, 0)
+    return len(contacts)
+
+
+async def measure(search, db: AsyncSession, query: str, user_id: int, repeat: int):
+    """Run one search several times and return its timing summary."""
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = await search(db, query, user_id)
+        timings.append((time.perf_counter() - start) * 1000)
+        db.expunge_all()
+    return {
+        "rows": rows,
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with sessionmanager.session() as db:
+        user_id = await seed(db, args.contacts, args.batch)
+        report = {"contacts": args.contacts, "repeat": args.repeat, "queries": {}}
+        for query in args.queries:
+            report["queries"][query] = {
+                "legacy_ilike": await measure(
+                    legacy_search, db, query, user_id, args.repeat
+                ),
+                "trigram_ranked": await measure(
+                    ranked_search, db, query, user_id, args.repeat
+                ),
+            }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contacts", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--queries", nargs="+", default=list(QUERIES))
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,97 @@
+"""
+Seed users and contacts for the load benchmark.
+
+Creates confirmed users named bench_user_<n> sharing one password, each
+with the same number of synthetic contacts whose birthdays are spread
+over the year. Seeding is idempotent; rerunning tops the data up:
+
+    python -m benchmarks.seed --users 50 --contacts 2000
+"""
+import argparse
+import asyncio
+import json
+
+from sqlalchemy import text
+
+from benchmarks import PASSWORD, USERNAME_PREFIX
+from src.core.password_hasher import password_hasher
+from src.database.db import sessionmanager
+
+
+SEED_USERS = text(
+    """
+    INSERT INTO users (username, email, hash_password, role, confirmed)
+    SELECT
+        :prefix || g,
+        :prefix || g || '@example.com',
+        :hash_password,
+        'USER',
+        TRUE
+    FROM generate_series(1, :users) AS g
+    ON CONFLICT (username) DO NOTHING
+    """
+)
+
+SEED_CONTACTS = text(
+    """
+    INSERT INTO contacts (
+        first_name, last_name, email, phone, birthday, created_at, updated_at,
+        user_id
+    )
+    SELECT
+        (ARRAY['Anna', 'Olaf', 'Maria', 'John', 'Ivan', 'Sofia', 'Petro', 'Lena'])
+            [1 + g % 8] || substr(md5(g::text), 1, 4),
+        (ARRAY['Smith', 'Kovalenko', 'Brown', 'Shevchenko', 'Nolan', 'Garcia'])
+            [1 + g % 6] || substr(md5(g::text), 5, 4),
+        'c' || g || '.u' || u.id || '@example.com',
+        '+380' || lpad((g % 1000000000)::text, 9, '0'),
+        DATE '1970-01-01' + (g * 37 % 18250),
+        now(),
+        now(),
+        u.id
+    FROM users AS u
+    CROSS JOIN generate_series(:start, :stop) AS g
+    WHERE u.username LIKE :pattern
+    ON CONFLICT DO NOTHING
+    """
+)
+
+
+async def seed(users: int, contacts: int, batch: int) -> dict:
+    """Seed the benchmark data and return its summary."""
+    hash_password = await password_hasher.hash(PASSWORD)
+    async with sessionmanager.session() as db:
+        await db.execute(
+            SEED_USERS,
+            {"prefix": USERNAME_PREFIX, "hash_password": hash_password, "users": users},
+        )
+        await db.commit()
+        pattern = f"{USERNAME_PREFIX}%"
+        for start in range(1, contacts + 1, batch):
+            stop = min(start + batch - 1, contacts)
+            await db.execute(
+                SEED_CONTACTS, {"start": start, "stop": stop, "pattern": pattern}
+            )
+            await db.commit()
+        await db.execute(text("ANALYZE users"))
+        await db.execute(text("ANALYZE contacts"))
+        await db.commit()
+        total = (
+            await db.execute(
+                text(
+                    "SELECT count(*) FROM contacts c JOIN users u ON u.id = c.user_id "
+                    "WHERE u.username LIKE :pattern"
+                ),
+                {"pattern": pattern},
+            )
+        ).scalar_one()
+    return {"users": users, "contacts_per_user": contacts, "contacts_total": total}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--contacts", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(seed(args.users, args.contacts, args.batch)), indent=2))
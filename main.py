@@ -1,41 +1,57 @@
-from datetime import datetime, timezone, timedelta
+import asyncio
+import logging
+from datetime import datetime
+from pathlib import Path
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from slowapi.errors import RateLimitExceeded
 
-from src.routes import contacts_route, auth_route
+from src.routes import contacts_route, auth_route, users_route
+from src.config.config import settings
 from src.database.db import get_db, sessionmanager
-from src.config import messages
+from src.core.depend_service import get_current_admin_user
+from src.core.metrics import MetricsMiddleware, render_metrics, timed_job
+from src.core.query_budget import QueryBudgetMiddleware
+from src.core.token_blacklist import token_blacklist
+from src.services.avatar_services import avatar_pipeline
+from src.services.avatar_storage import ImmutableStaticFiles
+from src.services.email_services import email_dispatcher
+from src.services.token_cleanup_services import cleanup_expired_tokens
 
 
 schedulers = AsyncIOScheduler()
-
-
-async def cleanup_expired_tokens():
-    """Cleanup expired tokens."""
-    async with sessionmanager.session() as db:
-        now = datetime.now(timezone.utc)
-        cutoff = now - timedelta(days=7)
-        stmt = text(
-            "DELETE FROM refresh_tokens WHERE expired_at < :now OR (revoked_at IS NOT NULL AND expired_at < :cutoff)"
-        )
-        await db.execute(stmt, {"now": now, "cutoff": cutoff})
-        await db.commit()
-        print(f"Expired tokens cleaned up at [{now.strftime('%Y-%m-%d %H:%M:%S')}]")
+logger = logging.getLogger("uvicorn.error")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """App lifespan."""
-    schedulers.add_job(cleanup_expired_tokens, "interval", hours=1)
+    schedulers.add_job(
+        timed_job("cleanup_expired_tokens", cleanup_expired_tokens),
+        "interval",
+        hours=1,
+        next_run_time=datetime.now(),
+    )
+    schedulers.add_job(
+        timed_job("rebuild_token_blacklist", token_blacklist.rebuild),
+        "interval",
+        hours=1,
+    )
     schedulers.start()
+    blacklist_listener = asyncio.create_task(token_blacklist.listen())
+    await avatar_pipeline.start()
+    if settings.EMAIL_DISPATCH_IN_APP:
+        await email_dispatcher.start()
     yield
+    if settings.EMAIL_DISPATCH_IN_APP:
+        await email_dispatcher.stop()
+    await avatar_pipeline.stop()
+    blacklist_listener.cancel()
     schedulers.shutdown()
 
 
@@ -47,26 +63,33 @@ app = FastAPI(
 )
 
 
-@app.exception_handler(RateLimitExceeded)
-async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
-    """Rate limit handler."""
-    return JSONResponse(
-        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-        content={"error": messages.requests_limit.get("en")},
-    )
-
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(MetricsMiddleware)
+if settings.QUERY_BUDGET_ENABLED:
+    app.add_middleware(
+        QueryBudgetMiddleware,
+        default_budget=settings.QUERY_BUDGET_DEFAULT or None,
+    )
 
 
 app.include_router(contacts_route.router, prefix="/api")
 app.include_router(auth_route.router, prefix="/api")
+app.include_router(users_route.router, prefix="/api")
+
+if settings.AVATAR_STORAGE == "local":
+    Path(settings.AVATAR_LOCAL_DIR).mkdir(parents=True, exist_ok=True)
+    app.mount(
+        settings.AVATAR_LOCAL_URL,
+        ImmutableStaticFiles(directory=settings.AVATAR_LOCAL_DIR),
+        name="avatars",
+    )
 
 
 @app.get("/")
@@ -89,8 +112,24 @@ async def healthchecker(db: AsyncSession = Depends(get_db)):
             )
         return {"message": "Welcome to FastAPI!"}
     except Exception as e:
-        print(e)
+        logger.error(f"Database healthcheck failed: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error connecting to the database",
-        )
\ No newline at end of file
+        )
+
+
+@app.get(
+    "/api/healthchecker/pool",
+    dependencies=[Depends(get_current_admin_user)],
+)
+async def pool_status():
+    """Database connection pool status, for admins."""
+    return sessionmanager.pool_status()
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,28 @@
+"""add refresh_tokens revoked_reason
+
+Revision ID: 4f8e2a6c1d37
+Revises: 7d3a5e0c91b4
+Create Date: 2026-10-18 18:12:40.518263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f8e2a6c1d37'
+down_revision: Union[str, None] = '7d3a5e0c91b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('refresh_tokens', sa.Column('revoked_reason', sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('refresh_tokens', 'revoked_reason')
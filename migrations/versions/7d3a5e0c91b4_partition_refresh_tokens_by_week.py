@@ -0,0 +1,104 @@
+"""partition refresh_tokens by week
+
+Revision ID: 7d3a5e0c91b4
+Revises: e2b94c17f05d
+Create Date: 2026-10-18 15:27:08.402311
+
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3a5e0c91b4'
+down_revision: Union[str, None] = 'e2b94c17f05d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Only the first weeks are created here. The token cleanup job creates the
+# rest of the refresh token lifetime at runtime (ensure_partitions), moving
+# any rows that landed in the default partition meanwhile.
+WEEKS_AHEAD = 2
+
+
+def _week_start(moment: datetime) -> datetime:
+    return (moment - timedelta(days=moment.weekday())).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_refresh_tokens_expired_at', table_name='refresh_tokens')
+    op.execute('ALTER TABLE refresh_tokens RENAME TO refresh_tokens_legacy')
+    op.execute('ALTER INDEX refresh_tokens_pkey RENAME TO refresh_tokens_legacy_pkey')
+    op.execute(
+        'ALTER TABLE refresh_tokens_legacy RENAME CONSTRAINT '
+        'refresh_tokens_token_hash_key TO refresh_tokens_legacy_token_hash_key'
+    )
+    op.execute('ALTER SEQUENCE refresh_tokens_id_seq OWNED BY NONE')
+    op.execute(
+        """
+        CREATE TABLE refresh_tokens (
+            id INTEGER NOT NULL DEFAULT nextval('refresh_tokens_id_seq'),
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            token_hash VARCHAR NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            expired_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            revoked_at TIMESTAMP WITHOUT TIME ZONE,
+            ip_address VARCHAR(50),
+            user_agent TEXT,
+            PRIMARY KEY (id, expired_at)
+        ) PARTITION BY RANGE (expired_at)
+        """
+    )
+    op.execute('ALTER SEQUENCE refresh_tokens_id_seq OWNED BY refresh_tokens.id')
+    op.create_index(op.f('ix_refresh_tokens_token_hash'), 'refresh_tokens', ['token_hash'], unique=False)
+    op.create_index(op.f('ix_refresh_tokens_expired_at'), 'refresh_tokens', ['expired_at'], unique=False)
+    op.execute('CREATE TABLE refresh_tokens_default PARTITION OF refresh_tokens DEFAULT')
+
+    lower = _week_start(datetime.now(timezone.utc))
+    for _ in range(WEEKS_AHEAD + 1):
+        upper = lower + timedelta(weeks=1)
+        op.execute(
+            f"CREATE TABLE refresh_tokens_p{lower:%Y%m%d} "
+            f"PARTITION OF refresh_tokens "
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        lower = upper
+
+    # Expired tokens are never read again, so only live ones are carried over.
+    op.execute(
+        'INSERT INTO refresh_tokens SELECT * FROM refresh_tokens_legacy '
+        'WHERE expired_at > now()'
+    )
+    op.drop_table('refresh_tokens_legacy')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER SEQUENCE refresh_tokens_id_seq OWNED BY NONE')
+    op.execute('ALTER TABLE refresh_tokens RENAME TO refresh_tokens_partitioned')
+    op.create_table('refresh_tokens',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('refresh_tokens_id_seq')"), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('token_hash', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('expired_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=True),
+    sa.Column('ip_address', sa.String(length=50), nullable=True),
+    sa.Column('user_agent', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('token_hash')
+    )
+    op.execute(
+        'INSERT INTO refresh_tokens SELECT DISTINCT ON (token_hash) * '
+        'FROM refresh_tokens_partitioned ORDER BY token_hash, id'
+    )
+    op.execute('ALTER SEQUENCE refresh_tokens_id_seq OWNED BY refresh_tokens.id')
+    op.execute('DROP TABLE refresh_tokens_partitioned CASCADE')
+    op.create_index(op.f('ix_refresh_tokens_expired_at'), 'refresh_tokens', ['expired_at'], unique=False)
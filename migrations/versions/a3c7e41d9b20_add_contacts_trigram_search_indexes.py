@@ -0,0 +1,68 @@
+"""add contacts trigram search indexes
+
+Revision ID: a3c7e41d9b20
+Revises: 5b1f0c9e2a71
+Create Date: 2026-10-18 10:03:17.552910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c7e41d9b20'
+down_revision: Union[str, None] = '5b1f0c9e2a71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRGM_COLUMNS = ('first_name', 'last_name', 'email')
+
+# column: (old varchar length, new varchar length, nullable)
+COLUMN_LENGTHS = {
+    'first_name': (3, 16, False),
+    'last_name': (3, 16, False),
+    'email': (5, 255, False),
+    'phone': (10, 15, True),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # String(min, max) was rendered as varchar(min); widen to the max lengths.
+    for column, (old_length, new_length, nullable) in COLUMN_LENGTHS.items():
+        op.alter_column(
+            'contacts',
+            column,
+            type_=sa.String(length=new_length),
+            existing_type=sa.String(length=old_length),
+            existing_nullable=nullable,
+        )
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in TRGM_COLUMNS:
+        op.create_index(
+            f'ix_contacts_{column}_trgm',
+            'contacts',
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in TRGM_COLUMNS:
+        op.drop_index(f'ix_contacts_{column}_trgm', table_name='contacts')
+
+    # Fails if a stored value no longer fits the old width.
+    for column, (old_length, new_length, nullable) in COLUMN_LENGTHS.items():
+        op.alter_column(
+            'contacts',
+            column,
+            type_=sa.String(length=old_length),
+            existing_type=sa.String(length=new_length),
+            existing_nullable=nullable,
+        )
@@ -1,3 +1,6 @@
+import math
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict, EmailStr
 
@@ -10,15 +13,94 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str
     POSTGRES_PORT: str
 
+    # Database pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_PGBOUNCER: bool = False
+
+    # Read replicas
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_POLICY: Literal["round_robin", "random"] = "round_robin"
+    DB_READ_YOUR_WRITES_SECONDS: int = 5
+
     # JWT
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_DAYS: int
     ALGORITHM: str
     SECRET_KEY: str
 
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_POOL_SIZE: int = 4
+    BCRYPT_MAX_QUEUE: int = 64
+
+    # Login protection
+    LOGIN_MAX_FAILURES_PER_USER: int = 5
+    LOGIN_MAX_FAILURES_PER_IP: int = 50
+    LOGIN_FAILURE_WINDOW: int = 900
+    LOGIN_NEGATIVE_CACHE_TTL: int = 60
+
+    # Refresh token cleanup
+    TOKEN_CLEANUP_BATCH_SIZE: int = 1000
+    TOKEN_CLEANUP_PAUSE_SECONDS: float = 0.05
+    TOKEN_CLEANUP_LOCK_TIMEOUT: int = 300
+
+    # Refresh token reuse detection
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: int = 10
+
+    # Query budget (development and CI)
+    QUERY_BUDGET_ENABLED: bool = False
+    QUERY_BUDGET_DEFAULT: int = 0
+
     # Redis
     REDIS_URL: str
 
+    # Rate limiting
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: dict[str, str] = {
+        "users.me": "10/minute",
+        "users.request_email": "5/minute",
+        "auth.login": "20/minute",
+        "auth.register": "10/minute",
+        "auth.refresh": "30/minute",
+        "contacts.list": "120/minute",
+        "contacts.search": "60/minute",
+        "contacts.import": "5/minute",
+        "contacts.export": "5/minute",
+    }
+
+    # Token blacklist
+    BLACKLIST_FILTER_CAPACITY: int = 100000
+    BLACKLIST_FILTER_ERROR_RATE: float = 0.001
+
+    # User cache
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_MAX_SIZE: int = 1024
+    USER_CACHE_LOCAL_TTL: int = 10
+    USER_CACHE_REDIS_TTL: int = 300
+
+    # Search
+    SEARCH_MAX_RESULTS: int = 100
+
+    # Birthdays (days after today; today is always included)
+    BIRTHDAY_WINDOW_DAYS: int = 7
+
+    # Contact list response cache
+    CONTACT_CACHE_ENABLED: bool = True
+    CONTACT_CACHE_TTL: int = 300
+
+    # Contact import
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_MAX_ERRORS: int = 1000
+
+    # Contact export
+    EXPORT_BATCH_SIZE: int = 1000
+
     # Email
     MAIL_USERNAME: EmailStr 
     MAIL_PASSWORD: str 
@@ -31,11 +113,54 @@ class Settings(BaseSettings):
     USE_CREDENTIALS: bool 
     VALIDATE_CERTS: bool 
 
+    # Avatars
+    AVATAR_STORAGE: Literal["cloudinary", "local", "s3"] = "cloudinary"
+    AVATAR_SPOOL_DIR: str = "var/avatar_spool"
+    AVATAR_LOCAL_DIR: str = "var/avatars"
+    AVATAR_LOCAL_URL: str = "/media/avatars"
+    AVATAR_MAX_BYTES: int = 5 * 1024 * 1024
+    AVATAR_MAX_PIXELS: int = 25_000_000
+    AVATAR_WORKERS: int = 2
+    AVATAR_PROCESS_WORKERS: int = 2
+    AVATAR_SIZES: list[int] = [250, 64]
+    AVATAR_WEBP_QUALITY: int = 85
+    AVATAR_QUEUE_SIZE: int = 100
+    AVATAR_JOB_TTL: int = 3600
+    AVATAR_S3_BUCKET: str = ""
+    AVATAR_S3_ENDPOINT_URL: str | None = None
+    AVATAR_S3_REGION: str | None = None
+    AVATAR_S3_ACCESS_KEY: str | None = None
+    AVATAR_S3_SECRET_KEY: str | None = None
+    AVATAR_S3_PUBLIC_URL: str = ""
+
+    # Email dispatch
+    EMAIL_DISPATCH_IN_APP: bool = True
+    EMAIL_SMTP_POOL_SIZE: int = 2
+    EMAIL_SMTP_TIMEOUT: int = 30
+    EMAIL_SMTP_IDLE_TIMEOUT: int = 60
+    EMAIL_BATCH_SIZE: int = 20
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_SECONDS: int = 30
+    EMAIL_RETRY_MAX_SECONDS: int = 3600
+    EMAIL_VERIFY_COOLDOWN_SECONDS: int = 60
+    EMAIL_VERIFY_TOKEN_CACHE_SECONDS: int = 86400
+
+    # Gravatar
+    GRAVATAR_DEFAULT: str = "identicon"
+    GRAVATAR_CHECK_ENABLED: bool = False
+    GRAVATAR_CACHE_TTL: int = 86400
+    GRAVATAR_TIMEOUT: float = 3.0
+
     # cloudinary
     CLOUDINARY_NAME: str
     CLOUDINARY_API_KEY: str 
     CLOUDINARY_API_SECRET: str 
 
+    @property
+    def TOKEN_PARTITION_WEEKS_AHEAD(self) -> int:
+        """Weekly refresh token partitions kept ahead of the current week."""
+        return math.ceil(self.REFRESH_TOKEN_EXPIRE_DAYS / 7) + 1
+
     @property
     def DB_URL(self):
         """Database URL."""
@@ -20,6 +20,10 @@ contact_schema_birthday = {
     "en": "Birthday:",
 }   
 
+contact_schema_birthday_mmdd = {
+    "en": "Birthday as MMDD:",
+}
+
 contact_schema_additional_info = {    
     "en": "Additional info:",
 }
@@ -120,6 +124,30 @@ contact_get_by_id_range = {
     "en": "Contacts with IDs retrieved",
 }
 
+contact_invalid_cursor = {
+    "en": "Invalid pagination cursor",
+}
+
+contact_precondition_failed = {
+    "en": "Contact was changed by another request",
+}
+
+contact_exists = {
+    "en": "Contact already exists",
+}
+
+contact_import_invalid_row = {
+    "en": "Invalid row",
+}
+
+contact_import_unreadable = {
+    "en": "File could not be read, it must be a UTF-8 encoded CSV or NDJSON file",
+}
+
+contact_unsupported_format = {
+    "en": "Unsupported file format, use CSV or NDJSON",
+}
+
 contact_birthday_description = {
     "en": "Birthday (YYYY-MM-DD)",
 }
@@ -188,6 +216,41 @@ invalid_refresh_token = {
     "en": "Invalid refresh token",     
 }
 
+reused_refresh_token = {
+    "en": "Refresh token reuse detected, all sessions revoked",
+}
+
+login_attempts_exceeded = {
+    "en": "Too many failed login attempts. Please try again later",
+}
+
+auth_busy = {
+    "en": "Authentication service is busy. Please try again later",
+}
+
+
+# AVATAR
+
+avatar_unsupported_type = {
+    "en": "Avatar must be an image",
+}
+
+avatar_too_large = {
+    "en": "Avatar file is too large",
+}
+
+avatar_too_many_pixels = {
+    "en": "Avatar image dimensions are too large",
+}
+
+avatar_queue_full = {
+    "en": "Avatar processing is busy. Please try again later",
+}
+
+avatar_job_not_found = {
+    "en": "Avatar job not found",
+}
+
 
 # LIMIT
 
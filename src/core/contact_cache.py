@@ -0,0 +1,158 @@
+"""
+Per-user contact collection version and the contact list response cache.
+
+Every write to a user's contacts bumps ``contacts:ver:<user id>``. List,
+search and birthday responses are cached under that version, so a write
+invalidates all of them at once and stale entries simply expire.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Sequence
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from redis.asyncio import Redis
+
+from src.config.config import settings
+from src.core.etag import etag_matches, make_etag, not_modified, set_etag
+from src.database.redis_client import redis_client
+from src.entity.models import Contact
+from src.schemas.contact_schema import ContactResponse
+
+
+# A missing counter starts from the server clock in ms rather than from 0,
+# so a counter lost to eviction does not go back to a version whose
+# responses may still be cached.
+SEED_VERSION = """
+local function seed(key)
+    local now = redis.call('TIME')
+    local version = tostring(now[1] * 1000 + math.floor(now[2] / 1000))
+    redis.call('SET', key, version)
+    return version
+end
+"""
+
+# KEYS: the version counter of the user.
+# ARGV: response key prefix of the user, digest of the request.
+# Returns {version, body, headers}; body and headers are nil on a miss.
+LOOKUP_SCRIPT = SEED_VERSION + """
+local version = redis.call('GET', KEYS[1]) or seed(KEYS[1])
+local cached = redis.call(
+    'HMGET', ARGV[1] .. version .. ':' .. ARGV[2], 'body', 'headers'
+)
+return {version, cached[1], cached[2]}
+"""
+
+# KEYS: the version counter of the user. Returns the new version.
+BUMP_SCRIPT = SEED_VERSION + """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    seed(KEYS[1])
+end
+return redis.call('INCR', KEYS[1])
+"""
+
+CONTACT_LIST = TypeAdapter(list[ContactResponse])
+
+
+@dataclass
+class CacheEntry:
+    """A cached response, or the slot for one."""
+    key: str
+    etag: str
+    body: bytes | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+class ContactCache:
+    """
+    Contact list responses cached in Redis per collection version.
+
+    A lookup reads the version and the cached response in one script call.
+    The response key is derived inside the script, so this needs a
+    non-clustered Redis.
+    """
+    version_prefix = "contacts:ver:"
+    prefix = "contacts:cache:"
+
+    def __init__(self, redis: Redis, ttl: int, enabled: bool = True):
+        self.redis = redis
+        self.ttl = ttl
+        self.enabled = enabled
+        self._lookup = redis.register_script(LOOKUP_SCRIPT)
+        self._bump = redis.register_script(BUMP_SCRIPT)
+
+    def version_key(self, user_id: int) -> str:
+        """Redis key of the collection version of a user."""
+        return f"{self.version_prefix}{user_id}"
+
+    async def bump(self, user_id: int) -> int:
+        """Record a change to the user's contacts; returns the new version."""
+        return await self._bump(keys=[self.version_key(user_id)])
+
+    async def lookup(self, user_id: int, endpoint: str, params: dict) -> CacheEntry:
+        """Find the cached response of a request at the current version."""
+        raw = json.dumps([endpoint, params], sort_keys=True, default=str)
+        digest = hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+        base = f"{self.prefix}{user_id}:"
+        version, body, headers = await self._lookup(
+            keys=[self.version_key(user_id)], args=[base, digest]
+        )
+        version = int(version)
+        entry = CacheEntry(
+            key=f"{base}{version}:{digest}",
+            etag=make_etag(endpoint, user_id, version, digest),
+        )
+        if self.enabled and body is not None:
+            entry.body = body
+            entry.headers = json.loads(headers)
+        return entry
+
+    async def store(self, entry: CacheEntry) -> None:
+        """Cache a rendered response."""
+        if not self.enabled:
+            return None
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(
+            entry.key,
+            mapping={"body": entry.body, "headers": json.dumps(entry.headers)},
+        )
+        pipe.expire(entry.key, self.ttl)
+        await pipe.execute()
+
+    async def respond(
+        self,
+        user_id: int,
+        endpoint: str,
+        params: dict,
+        if_none_match: str | None,
+        load: Callable[[], Awaitable[tuple[Sequence[Contact], dict[str, str]]]],
+    ) -> Response:
+        """
+        Serve a list of contacts through the cache.
+
+        Answers 304 when If-None-Match carries the current ETag and serves a
+        cached body when there is one; only otherwise ``load`` is awaited for
+        the contacts and extra response headers. The version is read before
+        loading, so a concurrent write can only leave a response cached under
+        a version that is already outdated.
+        """
+        entry = await self.lookup(user_id, endpoint, params)
+        if if_none_match is not None and etag_matches(if_none_match, entry.etag):
+            return not_modified(entry.etag)
+        if entry.body is None:
+            contacts, entry.headers = await load()
+            entry.body = CONTACT_LIST.dump_json(contacts)
+            await self.store(entry)
+        response = Response(
+            content=entry.body, media_type="application/json", headers=entry.headers
+        )
+        set_etag(response, entry.etag)
+        return response
+
+
+contact_cache = ContactCache(
+    redis_client,
+    ttl=settings.CONTACT_CACHE_TTL,
+    enabled=settings.CONTACT_CACHE_ENABLED,
+)
@@ -1,6 +1,7 @@
 from fastapi import (
     Depends,
-    HTTPException
+    HTTPException,
+    Request,
 )
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,7 +10,8 @@ from src.services.auth_services import AuthService, oauth2_scheme
 from src.services.user_services import UserService
 from src.entity.models import User, UserRole
 from src.config import messages
-from src.database.db import get_db
+from src.core.rate_limiter import client_ip, rate_limiter
+from src.database.db import get_db, sessionmanager, write_tracker
 
 
 def get_auth_service(db: AsyncSession = Depends(get_db)):
@@ -30,6 +32,45 @@ async def get_current_user(
     return await auth_service.get_current_user(token)
 
 
+def rate_limited_user(route: str):
+    """Get current user, counting the request against the route limit."""
+    async def dependency(
+        request: Request,
+        token: str = Depends(oauth2_scheme),
+        auth_service: AuthService = Depends(get_auth_service),
+    ) -> User:
+        return await auth_service.get_current_user(
+            token, route=route, ip_address=client_ip(request)
+        )
+    return dependency
+
+
+def rate_limit(route: str):
+    """Count an anonymous request against the route limit by address."""
+    async def dependency(request: Request) -> None:
+        await rate_limiter.hit(route, ip_address=client_ip(request))
+    return dependency
+
+
+def user_rate_limit(route: str):
+    """
+    Count the current user's request against the route limit.
+
+    For routes that already depend on get_current_user; the user is
+    counted by id only, so users behind one address do not share a limit.
+    """
+    async def dependency(user: User = Depends(get_current_user)) -> None:
+        await rate_limiter.hit(route, user_id=user.id)
+    return dependency
+
+
+async def get_read_db(user: User = Depends(get_current_user)):
+    """Get a read-only session, on a replica unless the user wrote recently."""
+    use_primary = await write_tracker.recent(user.id)
+    async with sessionmanager.read_session(use_primary) as session:
+        yield session
+
+
 # Get current Moderator
 def get_current_moderator_user(current_user: User = Depends(get_current_user)):
     """Get current moderator user."""
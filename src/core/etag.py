@@ -0,0 +1,92 @@
+"""
+Entity tags and HTTP precondition checks.
+
+A single contact gets a strong ETag: its representation is fully
+determined by its id and updated_at. Lists get weak ETags, derived from the
+collection version rather than from the serialized bytes. If-None-Match
+uses the weak comparison and If-Match the strong one, as RFC 9110 requires.
+"""
+import hashlib
+from datetime import datetime
+
+from fastapi import HTTPException, Response, status
+
+from src.config import messages
+
+
+# Clients may cache contact reads but must revalidate them every time.
+CACHE_CONTROL = "private, no-cache"
+
+
+class PreconditionFailed(Exception):
+    """The entity no longer has the ETag the request was conditioned on."""
+    def __init__(self, etag: str):
+        super().__init__(etag)
+        self.etag = etag
+
+
+def make_etag(*parts, weak: bool = True) -> str:
+    """ETag of the given version parts."""
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    digest = hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def contact_etag(contact_id: int, updated_at: datetime | None) -> str:
+    """Strong ETag of a single contact."""
+    return make_etag("contact", contact_id, updated_at, weak=False)
+
+
+def parse_etags(header: str) -> set[str] | None:
+    """
+    Entity tags of an If-Match / If-None-Match header.
+
+    Returns None for ``*``, which matches any current representation.
+    """
+    header = header.strip()
+    if header == "*":
+        return None
+    return {tag.strip() for tag in header.split(",") if tag.strip()}
+
+
+def etag_matches(header: str, etag: str, weak: bool = True) -> bool:
+    """
+    Compare an ETag against a conditional header.
+
+    The weak comparison ignores the ``W/`` prefix; the strong one only
+    matches when neither tag is weak.
+    """
+    tags = parse_etags(header)
+    if tags is None:
+        return True
+    if weak:
+        return etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in tags}
+    return not etag.startswith("W/") and etag in tags
+
+
+def check_if_match(header: str | None, etag: str) -> None:
+    """Raise PreconditionFailed when If-Match does not strongly match."""
+    if header is not None and not etag_matches(header, etag, weak=False):
+        raise PreconditionFailed(etag)
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Add the validator headers to a response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """304 response for a matching If-None-Match."""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_etag(response, etag)
+    return response
+
+
+def precondition_failed(error: PreconditionFailed) -> HTTPException:
+    """412 response for a failed If-Match."""
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail=messages.contact_precondition_failed.get("en"),
+        headers={"ETag": error.etag},
+    )
@@ -0,0 +1,59 @@
+import hashlib
+from urllib.parse import urlencode
+
+import requests
+from fastapi.concurrency import run_in_threadpool
+from redis.asyncio import Redis
+
+from src.config.config import settings
+from src.database.redis_client import redis_client
+
+
+GRAVATAR_BASE_URL = "https://www.gravatar.com/avatar/"
+
+
+def gravatar_hash(email: str) -> str:
+    """Gravatar hash of an email address."""
+    return hashlib.md5(email.strip().lower().encode()).hexdigest()
+
+
+def gravatar_url(email: str, default: str | None = None) -> str:
+    """Gravatar image URL; default selects the image for unknown addresses."""
+    url = GRAVATAR_BASE_URL + gravatar_hash(email)
+    if default:
+        url += "?" + urlencode({"d": default})
+    return url
+
+
+class GravatarChecker:
+    """Whether addresses have a Gravatar, with the answers cached in Redis."""
+    prefix = "gravatar:"
+
+    def __init__(self, redis: Redis, ttl: int, timeout: float):
+        self.redis = redis
+        self.ttl = ttl
+        self.timeout = timeout
+
+    async def exists(self, email: str) -> bool:
+        """Check whether Gravatar has an image for the address."""
+        key = f"{self.prefix}{gravatar_hash(email)}"
+        cached = await self.redis.get(key)
+        if cached is not None:
+            return cached == b"1"
+        found = await run_in_threadpool(self._lookup, email)
+        await self.redis.set(key, "1" if found else "0", ex=self.ttl)
+        return found
+
+    def _lookup(self, email: str) -> bool:
+        response = requests.head(gravatar_url(email, "404"), timeout=self.timeout)
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+
+gravatar_checker = GravatarChecker(
+    redis_client,
+    ttl=settings.GRAVATAR_CACHE_TTL,
+    timeout=settings.GRAVATAR_TIMEOUT,
+)
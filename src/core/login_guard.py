@@ -0,0 +1,129 @@
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+from fastapi import HTTPException, status
+from redis.asyncio import Redis
+
+from src.config.config import settings
+from src.config import messages
+from src.database.redis_client import redis_client
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into a single call.
+
+    The call runs in a task of its own rather than in the first caller, so
+    a caller that is cancelled stops waiting without failing the others.
+    """
+    def __init__(self):
+        self._calls: dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """Run func, or wait for the call already in flight for this key."""
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(func())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(call)
+
+    def _finish(self, key: str, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Retrieve the outcome so a call nobody waits for any more is not
+        # reported as an unhandled exception.
+        if not call.cancelled():
+            call.exception()
+
+
+class LoginGuard:
+    """
+    Login failure counters and negative cache of unknown usernames.
+
+    A username's failures are counted per client address, so nobody can
+    lock a user out from another address. All state lives in Redis so that
+    every worker sees the same counters; checking it costs one MGET before
+    any database or bcrypt work.
+    """
+    prefix = "auth:"
+
+    def __init__(
+        self,
+        redis: Redis,
+        max_user_failures: int,
+        max_ip_failures: int,
+        failure_window: int,
+        negative_ttl: int,
+    ):
+        self.redis = redis
+        self.max_user_failures = max_user_failures
+        self.max_ip_failures = max_ip_failures
+        self.failure_window = failure_window
+        self.negative_ttl = negative_ttl
+
+    def _user_key(self, username: str, ip_address: str | None) -> str:
+        return f"{self.prefix}fail:user:{username}:{ip_address}"
+
+    def _ip_key(self, ip_address: str | None) -> str:
+        return f"{self.prefix}fail:ip:{ip_address}"
+
+    def _missing_key(self, username: str) -> str:
+        return f"{self.prefix}missing:{username}"
+
+    async def check(self, username: str, ip_address: str | None) -> bool:
+        """
+        Reject a username locked out at this address, or the address.
+
+        Returns True when the username is known not to exist.
+        """
+        user_failures, ip_failures, missing = await self.redis.mget(
+            self._user_key(username, ip_address),
+            self._ip_key(ip_address),
+            self._missing_key(username),
+        )
+        if (
+            int(user_failures or 0) >= self.max_user_failures
+            or (ip_address and int(ip_failures or 0) >= self.max_ip_failures)
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=messages.login_attempts_exceeded.get("en"),
+            )
+        return missing is not None
+
+    async def record_failure(
+        self, username: str, ip_address: str | None, missing: bool = False
+    ) -> None:
+        """Count a failed attempt; remember the username if it is unknown."""
+        pipe = self.redis.pipeline(transaction=False)
+        user_key = self._user_key(username, ip_address)
+        pipe.incr(user_key)
+        pipe.expire(user_key, self.failure_window)
+        if ip_address:
+            pipe.incr(self._ip_key(ip_address))
+            pipe.expire(self._ip_key(ip_address), self.failure_window)
+        if missing:
+            pipe.set(self._missing_key(username), 1, ex=self.negative_ttl)
+        await pipe.execute()
+
+    async def record_success(self, username: str, ip_address: str | None) -> None:
+        """Reset the username failure counter of the address."""
+        await self.redis.delete(self._user_key(username, ip_address))
+
+    async def forget_missing(self, username: str) -> None:
+        """Drop the negative cache entry of a newly registered username."""
+        await self.redis.delete(self._missing_key(username))
+
+
+login_guard = LoginGuard(
+    redis_client,
+    max_user_failures=settings.LOGIN_MAX_FAILURES_PER_USER,
+    max_ip_failures=settings.LOGIN_MAX_FAILURES_PER_IP,
+    failure_window=settings.LOGIN_FAILURE_WINDOW,
+    negative_ttl=settings.LOGIN_NEGATIVE_CACHE_TTL,
+)
+credentials_lookup = SingleFlight()
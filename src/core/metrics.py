@@ -0,0 +1,138 @@
+"""
+Prometheus metrics.
+
+With PROMETHEUS_MULTIPROC_DIR set (several worker processes), every
+process writes its samples there and /metrics aggregates them.
+"""
+import functools
+import os
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+
+
+T = TypeVar("T")
+
+FAST_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time.",
+    ["engine"],
+    buckets=FAST_BUCKETS,
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection.",
+    buckets=FAST_BUCKETS,
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts",
+    "Database connection checkouts that timed out.",
+)
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Redis command round trip time; pipelines are reported as PIPELINE.",
+    ["command"],
+    buckets=FAST_BUCKETS,
+)
+BCRYPT_DURATION = Histogram(
+    "bcrypt_duration_seconds",
+    "Time spent in bcrypt, excluding the wait for a pool thread.",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.5),
+)
+JOB_DURATION = Histogram(
+    "scheduler_job_duration_seconds",
+    "Scheduled job run time.",
+    ["job"],
+    buckets=(0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0),
+)
+JOB_FAILURES = Counter(
+    "scheduler_job_failures",
+    "Scheduled job runs that raised.",
+    ["job"],
+)
+
+
+def timed_job(
+    name: str, func: Callable[[], Awaitable[T]]
+) -> Callable[[], Awaitable[T]]:
+    """Wrap a scheduled coroutine function to record its duration."""
+    duration = JOB_DURATION.labels(name)
+    failures = JOB_FAILURES.labels(name)
+
+    @functools.wraps(func)
+    async def wrapper() -> T:
+        start = time.perf_counter()
+        try:
+            return await func()
+        except Exception:
+            failures.inc()
+            raise
+        finally:
+            duration.observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, and its content type."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency per route template.
+
+    Labels use the matched route path (e.g. /api/contacts/{contact_id}), so
+    the number of series stays bounded.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                getattr(route, "path", "<unmatched>"),
+                str(status_code),
+            ).observe(time.perf_counter() - start)
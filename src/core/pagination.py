@@ -0,0 +1,28 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException, status
+
+from src.config import messages
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen id into an opaque cursor."""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode an opaque cursor into the last seen id."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_id = json.loads(raw)["id"]
+        if not isinstance(last_id, int):
+            raise ValueError(last_id)
+        return last_id
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=messages.contact_invalid_cursor.get("en"),
+        )
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from src.config.config import settings
+from src.config import messages
+from src.core.metrics import BCRYPT_DURATION
+
+
+T = TypeVar("T")
+
+HASH_DURATION = BCRYPT_DURATION.labels("hash")
+VERIFY_DURATION = BCRYPT_DURATION.labels("verify")
+
+
+def _timed(histogram, func: Callable[..., T], *args) -> T:
+    """Call func, recording its duration."""
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+
+class PasswordHasher:
+    """
+    Bcrypt hashing and verification off the event loop.
+
+    Work runs in a bounded thread pool (bcrypt releases the GIL). Calls
+    beyond the pool size plus BCRYPT_MAX_QUEUE are rejected with 503
+    instead of queueing without limit.
+    """
+    def __init__(self, rounds: int, pool_size: int, max_queue: int):
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="bcrypt"
+        )
+        self._capacity = pool_size + max_queue
+        self._pending = 0
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        """Run a bcrypt call in the pool."""
+        if self._pending >= self._capacity:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=messages.auth_busy.get("en"),
+            )
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash password."""
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        hashed_password = await self._run(
+            _timed, HASH_DURATION, bcrypt.hashpw, password.encode(), salt
+        )
+        return hashed_password.decode()
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify password."""
+        return await self._run(
+            _timed,
+            VERIFY_DURATION,
+            bcrypt.checkpw,
+            plain_password.encode(),
+            hashed_password.encode(),
+        )
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether the hash was made with a different cost."""
+        try:
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS,
+    pool_size=settings.BCRYPT_POOL_SIZE,
+    max_queue=settings.BCRYPT_MAX_QUEUE,
+)
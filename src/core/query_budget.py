@@ -0,0 +1,156 @@
+"""
+Per-request SQL accounting for development and CI.
+
+With QUERY_BUDGET_ENABLED the middleware counts the statements and loaded
+ORM rows of every request, reports lazy loads and joined eager loads, and
+rejects requests that run more statements than their declared budget.
+"""
+import logging
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, ORMExecuteState
+
+from src.config.config import settings
+from src.entity.models import Base
+
+
+logger = logging.getLogger("uvicorn.error")
+
+# Execution option of statements the application runs for its own
+# bookkeeping, such as the per-transaction statement timeout. They are
+# not counted against the budget of the route.
+UNCOUNTED = "query_budget_uncounted"
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request ran more SQL statements than its budget allows."""
+
+
+class QueryStats:
+    """Statements, rows and loader findings of one request."""
+    __slots__ = ("statements", "rows", "budget", "lazy_loads", "joined_loads")
+
+    def __init__(self, budget: int | None = None):
+        self.statements = 0
+        self.rows = 0
+        self.budget = budget
+        self.lazy_loads: list[str] = []
+        self.joined_loads: set[str] = set()
+
+    def as_dict(self) -> dict:
+        """Stats as a dict."""
+        return {
+            "statements": self.statements,
+            "rows": self.rows,
+            "budget": self.budget,
+            "lazy_loads": self.lazy_loads,
+            "joined_loads": sorted(self.joined_loads),
+        }
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def current_query_stats() -> QueryStats | None:
+    """Stats of the request being handled, if accounting is on."""
+    return _current_stats.get()
+
+
+def query_budget(limit: int):
+    """Declare the maximum number of SQL statements a route may run."""
+    def dependency() -> None:
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.budget = limit
+    return dependency
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None or context.execution_options.get(UNCOUNTED):
+        return
+    stats.statements += 1
+    if stats.budget is not None and stats.statements > stats.budget:
+        raise QueryBudgetExceeded(
+            f"Query budget of {stats.budget} exceeded: {statement}"
+        )
+
+
+def _on_load(target, context):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.rows += 1
+
+
+def _do_orm_execute(state: ORMExecuteState):
+    stats = _current_stats.get()
+    if stats is None or not state.is_select:
+        return
+    if state.lazy_loaded_from is not None:
+        stats.lazy_loads.append(str(state.loader_strategy_path))
+        return
+    for description in state.statement.column_descriptions:
+        entity = description.get("entity")
+        if entity is None or description.get("type") is not entity:
+            continue
+        mapper = entity.__mapper__
+        for relationship in mapper.relationships:
+            if relationship.lazy == "joined":
+                stats.joined_loads.add(str(relationship))
+
+
+def install_listeners() -> None:
+    """Attach the accounting hooks to all engines, sessions and models."""
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Session, "do_orm_execute", _do_orm_execute)
+    event.listen(Base, "load", _on_load, propagate=True)
+
+
+class QueryBudgetMiddleware:
+    """
+    Pure ASGI middleware that accounts SQL per request.
+
+    Adds X-Query-Count and X-Query-Rows response headers and logs lazy loads
+    and joined eager loads. Queries run after the response has started
+    (streamed bodies) are counted in the log line only.
+    """
+    def __init__(self, app, default_budget: int | None = None):
+        self.app = app
+        self.default_budget = default_budget
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(self.default_budget)
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-query-count", str(stats.statements).encode()),
+                    (b"x-query-rows", str(stats.rows).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            if stats.lazy_loads or stats.joined_loads:
+                logger.warning(
+                    f"{scope['method']} {scope['path']}: "
+                    f"lazy loads {stats.lazy_loads}, "
+                    f"joined eager loads {sorted(stats.joined_loads)}"
+                )
+            logger.debug(f"{scope['method']} {scope['path']}: {stats.as_dict()}")
+
+
+if settings.QUERY_BUDGET_ENABLED:
+    install_listeners()
@@ -0,0 +1,143 @@
+import re
+import time
+
+from fastapi import HTTPException, Request, status
+from redis.asyncio import Redis
+
+from src.config.config import settings
+from src.config import messages
+from src.database.redis_client import redis_client
+
+
+RATE_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+RATE_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)s?\s*$")
+
+# KEYS: (current window, previous window) per identity, then optionally the
+# blacklist key of the access token.
+# ARGV: now in ms, number of identities, then (limit, window in ms) per
+# identity.
+# Returns {allowed, retry after in ms, revoked}. Revoked tokens and rejected
+# requests are not counted.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local count = tonumber(ARGV[2])
+if #KEYS > count * 2 and redis.call('EXISTS', KEYS[#KEYS]) == 1 then
+    return {0, 0, 1}
+end
+local retry_after = 0
+for i = 1, count do
+    local limit = tonumber(ARGV[1 + i * 2])
+    local window = tonumber(ARGV[2 + i * 2])
+    local elapsed = now % window
+    local current = tonumber(redis.call('GET', KEYS[i * 2 - 1]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[i * 2]) or '0')
+    if previous * (window - elapsed) / window + current + 1 > limit then
+        local wait = window - elapsed
+        if current + 1 <= limit and previous > 0 then
+            wait = math.ceil(
+                window * (previous - limit + current + 1) / previous
+            ) - elapsed
+        end
+        retry_after = math.max(retry_after, wait, 1)
+    end
+end
+if retry_after > 0 then
+    return {0, retry_after, 0}
+end
+for i = 1, count do
+    redis.call('INCR', KEYS[i * 2 - 1])
+    redis.call('PEXPIRE', KEYS[i * 2 - 1], tonumber(ARGV[2 + i * 2]) * 2)
+end
+return {1, 0, 0}
+"""
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """Parse a rate such as "10/minute" into (limit, window in seconds)."""
+    match = RATE_PATTERN.match(rate)
+    if match is None:
+        raise ValueError(f"Invalid rate limit: {rate!r}")
+    return int(match.group(1)), RATE_PERIODS[match.group(2)]
+
+
+def client_ip(request: Request | None) -> str | None:
+    """Client address of the request."""
+    if request is None or request.client is None:
+        return None
+    return request.client.host
+
+
+class RateLimiter:
+    """
+    Cluster-wide sliding window rate limiter.
+
+    Counters live in Redis, one pair of fixed windows per route and
+    identity (user and client address), weighted into a sliding window.
+    Every check, including the optional access token blacklist lookup, is a
+    single script call.
+    """
+    prefix = "rl:"
+
+    def __init__(self, redis: Redis, limits: dict[str, str], enabled: bool = True):
+        self.redis = redis
+        self.limits = {route: parse_rate(rate) for route, rate in limits.items()}
+        self.enabled = enabled
+        self._script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def is_limited(self, route: str) -> bool:
+        """Whether a limit is configured for the route."""
+        return self.enabled and route in self.limits
+
+    async def hit(
+        self,
+        route: str,
+        user_id: int | None = None,
+        ip_address: str | None = None,
+        revoked_key: str | None = None,
+    ) -> bool:
+        """
+        Count a request against the route limit.
+
+        Raises 429 with Retry-After when the user or the address is over the
+        limit. When revoked_key is given the blacklist is checked in the same
+        call; returns whether that key exists.
+        """
+        if not self.is_limited(route):
+            if revoked_key is None:
+                return False
+            return bool(await self.redis.exists(revoked_key))
+
+        limit, window = self.limits[route]
+        window_ms = window * 1000
+        now = int(time.time() * 1000)
+        index = now // window_ms
+        identities = [f"user:{user_id}"] if user_id is not None else []
+        if ip_address is not None:
+            identities.append(f"ip:{ip_address}")
+
+        keys = []
+        args = [now, len(identities)]
+        for identity in identities:
+            base = f"{self.prefix}{route}:{identity}:"
+            keys += [f"{base}{index}", f"{base}{index - 1}"]
+            args += [limit, window_ms]
+        if revoked_key is not None:
+            keys.append(revoked_key)
+
+        allowed, retry_after, revoked = await self._script(keys=keys, args=args)
+        if revoked:
+            return True
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=messages.requests_limit.get("en"),
+                headers={"Retry-After": str(-(-int(retry_after) // 1000))},
+            )
+        return False
+
+
+rate_limiter = RateLimiter(
+    redis_client,
+    settings.RATE_LIMITS,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
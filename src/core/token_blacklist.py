@@ -0,0 +1,134 @@
+import asyncio
+import hashlib
+import logging
+import math
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.config.config import settings
+from src.database.redis_client import redis_client
+
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings."""
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        """Add item."""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class TokenBlacklist:
+    """
+    Revoked access tokens, keyed by their ``jti`` claim.
+
+    Redis is the source of truth. Each worker keeps a Bloom filter of the
+    revoked ids, fed by Redis pub/sub, and only asks Redis when the filter
+    answers "maybe". Until the subscription is up every check goes to Redis.
+    """
+    prefix = "bl:"
+    channel = "bl:revoked"
+
+    def __init__(self, redis: Redis, capacity: int, error_rate: float):
+        self.redis = redis
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.filter = BloomFilter(capacity, error_rate)
+        self._next_filter: BloomFilter | None = None
+        self._rebuild_lock = asyncio.Lock()
+        self.ready = False
+
+    def _add(self, token_id: str) -> None:
+        """Add a token id to the filter, and to the one being rebuilt."""
+        self.filter.add(token_id)
+        if self._next_filter is not None:
+            self._next_filter.add(token_id)
+
+    def key(self, token_id: str) -> str:
+        """Redis key of a blacklisted token id."""
+        return f"{self.prefix}{token_id}"
+
+    async def revoke(self, token_id: str, ttl: int) -> None:
+        """Blacklist a token id for ttl seconds and notify all workers."""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.setex(self.key(token_id), ttl, "1")
+        pipe.publish(self.channel, token_id)
+        await pipe.execute()
+        self._add(token_id)
+
+    def might_be_revoked(self, token_id: str) -> bool:
+        """Whether Redis has to be asked about the token id."""
+        return not self.ready or token_id in self.filter
+
+    async def is_revoked(self, token_id: str) -> bool:
+        """Check whether a token id is blacklisted."""
+        if not self.might_be_revoked(token_id):
+            return False
+        return bool(await self.redis.exists(self.key(token_id)))
+
+    async def rebuild(self) -> None:
+        """
+        Rebuild the filter from Redis, dropping expired ids.
+
+        Rebuilds are serialized: ids published while one is scanning are
+        added to the filter being built, which only works for one at a time.
+        """
+        async with self._rebuild_lock:
+            bloom = self._next_filter = BloomFilter(
+                self.capacity, self.error_rate
+            )
+            try:
+                async for key in self.redis.scan_iter(
+                    match=f"{self.prefix}*", count=1000
+                ):
+                    bloom.add(key.decode()[len(self.prefix):])
+                self.filter = bloom
+            finally:
+                self._next_filter = None
+
+    async def listen(self) -> None:
+        """Keep the filter in sync with revocations from other workers."""
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    await self.rebuild()
+                    self.ready = True
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._add(message["data"].decode())
+            except asyncio.CancelledError:
+                self.ready = False
+                raise
+            except RedisError as e:
+                self.ready = False
+                logger.warning(f"Token blacklist subscription lost: {e}")
+                await asyncio.sleep(1)
+
+
+token_blacklist = TokenBlacklist(
+    redis_client,
+    capacity=settings.BLACKLIST_FILTER_CAPACITY,
+    error_rate=settings.BLACKLIST_FILTER_ERROR_RATE,
+)
@@ -0,0 +1,125 @@
+import json
+import time
+from collections import OrderedDict
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.config.config import settings
+from src.database.redis_client import redis_client
+from src.entity.models import User, UserRole
+
+
+CACHED_USER_FIELDS = ("id", "username", "email", "role", "avatar", "confirmed")
+
+
+class LocalTTLCache:
+    """In-process LRU cache with a fixed time to live per entry."""
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def get(self, key: str) -> dict | None:
+        """Get value by key."""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: dict) -> None:
+        """Set value by key."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Delete value by key."""
+        self._data.pop(key, None)
+
+
+class UserCache:
+    """
+    User cache keyed by username.
+
+    Lookups go to the in-process LRU first and then to Redis. Invalidation
+    clears both levels of the current process; other workers drop their
+    local copy once its (short) TTL expires.
+    """
+    prefix = "user:"
+
+    def __init__(
+        self,
+        remote: Redis | None,
+        max_size: int,
+        local_ttl: float,
+        remote_ttl: int,
+        enabled: bool = True,
+    ):
+        self.remote = remote
+        self.local = LocalTTLCache(max_size, local_ttl)
+        self.remote_ttl = remote_ttl
+        self.enabled = enabled
+
+    async def get(self, username: str) -> dict | None:
+        """Get cached user data."""
+        if not self.enabled:
+            return None
+        data = self.local.get(username)
+        if data is not None or self.remote is None:
+            return data
+        raw = await self.remote.get(self.prefix + username)
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        self.local.set(username, data)
+        return data
+
+    async def set(self, user: User) -> None:
+        """Cache user data."""
+        if not self.enabled:
+            return None
+        data = serialize_user(user)
+        self.local.set(user.username, data)
+        if self.remote is not None:
+            await self.remote.set(
+                self.prefix + user.username, json.dumps(data), ex=self.remote_ttl
+            )
+
+    async def invalidate(self, username: str) -> None:
+        """Drop cached user data."""
+        self.local.delete(username)
+        if self.remote is not None:
+            await self.remote.delete(self.prefix + username)
+
+
+def serialize_user(user: User, with_password: bool = False) -> dict:
+    """Serialize user to a JSON-compatible dict."""
+    data = {field: getattr(user, field) for field in CACHED_USER_FIELDS}
+    data["role"] = UserRole(data["role"]).value
+    if with_password:
+        data["hash_password"] = user.hash_password
+    return data
+
+
+async def attach_user(db: AsyncSession, data: dict) -> User:
+    """Attach cached user data to the session without querying the database."""
+    user = User(**{**data, "role": UserRole(data["role"])})
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+user_cache = UserCache(
+    redis_client,
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    local_ttl=settings.USER_CACHE_LOCAL_TTL,
+    remote_ttl=settings.USER_CACHE_REDIS_TTL,
+    enabled=settings.USER_CACHE_ENABLED,
+)
@@ -1,30 +1,188 @@
 import contextlib
+import itertools
 import logging
+import random
+import time
+from uuid import uuid4
 
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     async_sessionmaker,
     create_async_engine,
 )
+from redis.asyncio import Redis
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.config.config import settings
+from src.core.metrics import DB_POOL_TIMEOUTS, DB_POOL_WAIT, DB_QUERY_DURATION
+from src.core.query_budget import UNCOUNTED
+from src.database.redis_client import redis_client
 
 logger = logging.getLogger("uvicorn.error")
 
 
+class PoolStats:
+    """Connection pool checkout counters."""
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        """Record the time a checkout waited for a connection."""
+        self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def as_dict(self) -> dict:
+        """Counters as a dict."""
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_total_seconds": round(self.wait_total, 6),
+            "wait_max_seconds": round(self.wait_max, 6),
+        }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that measures how long checkouts wait."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.stats.timeouts += 1
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.stats.record_wait(waited)
+            DB_POOL_WAIT.observe(waited)
+
+
+def build_engine_options() -> dict:
+    """Engine and pool options from settings."""
+    connect_args: dict = {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    if settings.DB_PGBOUNCER:
+        # PgBouncer in transaction mode cannot keep named prepared statements
+        # or startup parameters across server connections; the statement
+        # timeout is set per transaction instead (see set_statement_timeout).
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)
+        }
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
 class DatabaseSessionManager:
-    def __init__(self, url: str):
-        self._engine: AsyncEngine | None = create_async_engine(url)
+    def __init__(
+        self,
+        url: str,
+        replica_urls: list[str] | tuple[str, ...] = (),
+        replica_policy: str = "round_robin",
+        **engine_options,
+    ):
+        self._engine: AsyncEngine | None = create_async_engine(
+            url, **engine_options
+        )
         self._session_maker: async_sessionmaker = async_sessionmaker(
             autoflush=False, autocommit=False, bind=self._engine
         )
+        self._replica_engines: list[AsyncEngine] = [
+            create_async_engine(replica_url, **engine_options)
+            for replica_url in replica_urls
+        ]
+        self._replica_session_makers: list[async_sessionmaker] = [
+            async_sessionmaker(autoflush=False, autocommit=False, bind=engine)
+            for engine in self._replica_engines
+        ]
+        self._replica_policy = replica_policy
+        self._replica_cycle = itertools.cycle(self._replica_session_makers)
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        """Primary engine followed by the replica engines."""
+        return [self._engine, *self._replica_engines]
+
+    @property
+    def has_replicas(self) -> bool:
+        """Whether any read replica is configured."""
+        return bool(self._replica_session_makers)
+
+    def _select_replica(self) -> async_sessionmaker:
+        """Pick a replica session maker according to the policy."""
+        if self._replica_policy == "random":
+            return random.choice(self._replica_session_makers)
+        return next(self._replica_cycle)
+
+    def pool_status(self) -> dict:
+        """Current pool occupancy and checkout counters."""
+        status = self._engine_pool_status(self._engine)
+        if self._replica_engines:
+            status["replicas"] = [
+                self._engine_pool_status(engine)
+                for engine in self._replica_engines
+            ]
+        return status
+
+    @staticmethod
+    def _engine_pool_status(engine: AsyncEngine) -> dict:
+        """Pool occupancy and checkout counters of one engine."""
+        pool = engine.sync_engine.pool
+        status = {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        }
+        if isinstance(pool, InstrumentedQueuePool):
+            status.update(pool.stats.as_dict())
+        return status
 
     @contextlib.asynccontextmanager
     async def session(self):
         if self._session_maker is None:
             raise Exception("Database session is not initialized")
-        session = self._session_maker()
+        async with self._managed_session(self._session_maker) as session:
+            yield session
+
+    @contextlib.asynccontextmanager
+    async def read_session(self, use_primary: bool = False):
+        """Session for read-only work, bound to a replica when available."""
+        if use_primary or not self.has_replicas:
+            async with self.session() as session:
+                yield session
+            return
+        async with self._managed_session(self._select_replica()) as session:
+            yield session
+
+    @contextlib.asynccontextmanager
+    async def _managed_session(self, session_maker: async_sessionmaker):
+        session = session_maker()
         try:
             yield session
         except SQLAlchemyError as e:
@@ -39,9 +197,76 @@ class DatabaseSessionManager:
             await session.close()
 
 
-sessionmanager = DatabaseSessionManager(settings.DB_URL)
+sessionmanager = DatabaseSessionManager(
+    settings.DB_URL,
+    replica_urls=settings.DB_REPLICA_URLS,
+    replica_policy=settings.DB_REPLICA_POLICY,
+    **build_engine_options(),
+)
+
+
+def observe_queries(engine: AsyncEngine, name: str) -> None:
+    """Record the execution time of every statement run on the engine."""
+    histogram = DB_QUERY_DURATION.labels(name)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        histogram.observe(time.perf_counter() - conn.info.pop("query_start"))
+
+
+for index, engine in enumerate(sessionmanager.engines):
+    observe_queries(engine, "primary" if index == 0 else f"replica{index - 1}")
+
+
+def set_statement_timeout(session, transaction, connection) -> None:
+    """Apply the statement timeout to the transaction that just began."""
+    connection.exec_driver_sql(
+        f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}",
+        execution_options={UNCOUNTED: True},
+    )
+
+
+if settings.DB_PGBOUNCER and settings.DB_STATEMENT_TIMEOUT_MS:
+    event.listen(Session, "after_begin", set_statement_timeout)
+
+
+class WriteTracker:
+    """
+    Remembers recent writes per user in Redis.
+
+    Reads of a user who wrote within the window go to the primary, so the
+    user never sees a replica that has not caught up with their own write.
+    """
+    prefix = "db:rw:"
+
+    def __init__(self, redis: Redis, window: int, enabled: bool = True):
+        self.redis = redis
+        self.window = window
+        self.enabled = enabled and window > 0
+
+    async def mark(self, user_id: int) -> None:
+        """Record a write made by the user."""
+        if self.enabled:
+            await self.redis.set(f"{self.prefix}{user_id}", 1, ex=self.window)
+
+    async def recent(self, user_id: int) -> bool:
+        """Whether the user wrote within the window."""
+        if not self.enabled:
+            return False
+        return bool(await self.redis.exists(f"{self.prefix}{user_id}"))
+
+
+write_tracker = WriteTracker(
+    redis_client,
+    settings.DB_READ_YOUR_WRITES_SECONDS,
+    enabled=sessionmanager.has_replicas,
+)
 
 
 async def get_db():
     async with sessionmanager.session() as session:
-        yield session
\ No newline at end of file
+        yield session
@@ -0,0 +1,40 @@
+import time
+
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+
+from src.config.config import settings
+from src.core.metrics import REDIS_COMMAND_DURATION
+
+
+PIPELINE_DURATION = REDIS_COMMAND_DURATION.labels("PIPELINE")
+
+
+class InstrumentedPipeline(Pipeline):
+    """Pipeline that records the round trip time of each execute."""
+    async def execute(self, raise_on_error: bool = True):
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            PIPELINE_DURATION.observe(time.perf_counter() - start)
+
+
+class InstrumentedRedis(redis.Redis):
+    """Redis client that records command latency."""
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_DURATION.labels(args[0]).observe(
+                time.perf_counter() - start
+            )
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+redis_client = InstrumentedRedis.from_url(settings.REDIS_URL)
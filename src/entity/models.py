@@ -10,6 +10,9 @@ from sqlalchemy import (
     Text,
     ForeignKey,
     Boolean,
+    Computed,
+    Index,
+    Integer,
     Enum as SqlEnum
 )
 from sqlalchemy.orm import (
@@ -34,27 +37,24 @@ class Contact(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     first_name: Mapped[str] = mapped_column(
-        String(
-            constants.FIRST_NAME_MIN_LENGTH, 
-            constants.FIRST_NAME_MAX_LENGTH
-        ), 
+        String(constants.FIRST_NAME_MAX_LENGTH), 
         nullable=False,
         comment=messages.contact_schema_first_name.get('en')
     )
     last_name: Mapped[str] = mapped_column(
-        String(constants.LAST_NAME_MIN_LENGTH, constants.LAST_NAME_MAX_LENGTH), 
+        String(constants.LAST_NAME_MAX_LENGTH), 
         nullable=False,
         comment=messages.contact_schema_last_name.get('en')
     )
     email: Mapped[str] = mapped_column(
-        String(constants.EMAIL_MIN_LENGTH, constants.EMAIL_MAX_LENGTH), 
+        String(constants.EMAIL_MAX_LENGTH), 
         nullable=False,
         unique=True,
         index=True,
         comment=messages.contact_schema_email.get('en')
     )
     phone: Mapped[str | None] = mapped_column(
-        String(constants.PHONE_MIN_LENGTH, constants.PHONE_MAX_LENGTH),
+        String(constants.PHONE_MAX_LENGTH),
         nullable=True,
         comment=messages.contact_schema_phone.get('en')
     )
@@ -63,6 +63,16 @@ class Contact(Base):
         nullable=True,
         comment=messages.contact_schema_birthday.get('en')
     )
+    birthday_mmdd: Mapped[int | None] = mapped_column(
+        Integer,
+        Computed(
+            "(EXTRACT(MONTH FROM birthday) * 100"
+            " + EXTRACT(DAY FROM birthday))::integer",
+            persisted=True,
+        ),
+        nullable=True,
+        comment=messages.contact_schema_birthday_mmdd.get('en')
+    )
     additional_info: Mapped[str | None] = mapped_column(
         String(255), 
         nullable=True,
@@ -80,7 +90,30 @@ class Contact(Base):
         comment=messages.contact_schema_updated_at.get('en')
     )
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=True)
-    user: Mapped["User"] = relationship("User", backref="contacts", lazy="joined")
+    user: Mapped["User"] = relationship("User", backref="contacts", lazy="select")
+
+    __table_args__ = (
+        Index("ix_contacts_user_id_id", "user_id", "id"),
+        Index("ix_contacts_user_id_birthday_mmdd", "user_id", "birthday_mmdd"),
+        Index(
+            "ix_contacts_first_name_trgm",
+            "first_name",
+            postgresql_using="gin",
+            postgresql_ops={"first_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_contacts_last_name_trgm",
+            "last_name",
+            postgresql_using="gin",
+            postgresql_ops={"last_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_contacts_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+    )
     
 
 class UserRole(str, Enum):
@@ -90,6 +123,13 @@ class UserRole(str, Enum):
     ADMIN = "ADMIN"
 
 
+class TokenRevokeReason(str, Enum):
+    """Why a refresh token was revoked."""
+    ROTATED = "rotated"
+    LOGOUT = "logout"
+    REUSE = "reuse"
+
+
 class User(Base):
     """Represents a user in the system."""
     __tablename__ = "users"
@@ -108,19 +148,27 @@ class User(Base):
 
 
 class RefreshToken(Base):
-    """Represents a refresh token in the system."""
+    """
+    Represents a refresh token in the system.
+
+    The table is range-partitioned by week of ``expired_at``; the partition
+    key is part of the primary key, so ``token_hash`` is indexed per
+    partition instead of being globally unique.
+    """
     __tablename__ = "refresh_tokens"
-    id: Mapped[int] = mapped_column(primary_key=True)
+    __table_args__ = {"postgresql_partition_by": "RANGE (expired_at)"}
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    token_hash: Mapped[str] = mapped_column(nullable=False, unique=True)
+    token_hash: Mapped[str] = mapped_column(nullable=False, index=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=func.now(), nullable=False
     )
     expired_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False
+        DateTime(timezone=True), primary_key=True, nullable=False, index=True
     )
     """ revoked_at: Mapped[datetime] | None = mapped_column(DateTime(timezone=True), nullable=True) """
     revoked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    revoked_reason: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
     ip_address: Mapped[str] = mapped_column(String(50), nullable=True)
     user_agent: Mapped[str] = mapped_column(Text, nullable=True)
 
@@ -1,10 +1,15 @@
 import logging
 from datetime import date
-from typing import Sequence
+from typing import AsyncIterator, Sequence
 
-from sqlalchemy import select, or_, func, asc
+from sqlalchemy import select, or_, func, asc, case
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.contact_cache import contact_cache
+from src.core.etag import check_if_match, contact_etag
+from src.database.db import write_tracker
 from src.entity.models import Contact, User
 from src.schemas.contact_schema import ContactSchema, ContactUpdateSchema
 
@@ -12,6 +17,13 @@ from src.schemas.contact_schema import ContactSchema, ContactUpdateSchema
 logger = logging.getLogger("uvicorn.error")
 
 
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so the query is matched literally."""
+    return (
+        value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+
+
 class ContactRepository:
     """Contact repository."""
     def __init__(self, session: AsyncSession):
@@ -21,60 +33,154 @@ class ContactRepository:
             self, 
             limit: int, 
             offset: int, 
-            user: User
+            user: User,
+            after_id: int | None = None,
     ) -> Sequence[Contact]:
-        """Get a list of contacts."""
+        """
+        Get a list of contacts.
+
+        When ``after_id`` is given the page starts right after that id
+        (keyset pagination) and ``offset`` is ignored.
+        """
         stmt = (
             select(Contact)
             .filter_by(user_id=user.id)
             .order_by(Contact.id)
-            .offset(offset)
-            .limit(limit)
         )
+        if after_id is not None:
+            stmt = stmt.where(Contact.id > after_id)
+        else:
+            stmt = stmt.offset(offset)
+        stmt = stmt.limit(limit)
         contacts = await self.db.execute(stmt)
         return contacts.scalars().all()
 
+    async def stream_contacts(
+            self,
+            user: User,
+            batch_size: int
+    ) -> AsyncIterator[Contact]:
+        """Stream all contacts through a server-side cursor."""
+        stmt = (
+            select(Contact)
+            .filter_by(user_id=user.id)
+            .order_by(Contact.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.db.stream(stmt)
+        async for contact in result.scalars():
+            yield contact
+
     async def get_contact_by_id(
             self, 
             contact_id: int, 
-            user: User
+            user: User,
+            for_update: bool = False,
     ) -> Contact | None:
-        """Get a contact by ID."""
+        """Get a contact by ID, optionally locking its row."""
         stmt = select(Contact).filter_by(id=contact_id, user_id=user.id)
+        if for_update:
+            stmt = stmt.with_for_update()
         contact = await self.db.execute(stmt)
         return contact.scalar_one_or_none()
 
+    async def get_contact_version(
+            self,
+            contact_id: int,
+            user: User
+    ) -> Row | None:
+        """Get the id and updated_at of a contact without loading it."""
+        stmt = select(Contact.id, Contact.updated_at).filter_by(
+            id=contact_id, user_id=user.id
+        )
+        result = await self.db.execute(stmt)
+        return result.one_or_none()
+
     async def create_contact(
             self, body: ContactSchema, 
             user: User
     ) -> Contact:
         """Create a new contact."""
+        user_id = user.id
         contact = Contact(**body.model_dump(), user=user)
         self.db.add(contact)
         await self.db.commit()
         await self.db.refresh(contact)
+        await write_tracker.mark(user_id)
+        await contact_cache.bump(user_id)
         return contact
 
+    async def create_contacts_bulk(
+            self,
+            rows: list[dict],
+            user: User
+    ) -> list[str]:
+        """
+        Insert many contacts with one multi-row INSERT and one commit.
+
+        Rows that conflict with an existing contact are skipped; the emails
+        of the inserted rows are returned.
+        """
+        if not rows:
+            return []
+        stmt = (
+            insert(Contact)
+            .on_conflict_do_nothing()
+            .returning(Contact.email)
+        )
+        user_id = user.id
+        result = await self.db.execute(
+            stmt, [{**row, "user_id": user_id} for row in rows]
+        )
+        emails = list(result.scalars().all())
+        await self.db.commit()
+        await write_tracker.mark(user_id)
+        if emails:
+            await contact_cache.bump(user_id)
+        return emails
+
     async def remove_contact(
             self, contact_id: 
-            int, user: User
+            int, user: User,
+            if_match: str | None = None,
     ) -> Contact | None:
-        """Remove a contact by ID."""
-        contact = await self.get_contact_by_id(contact_id, user)
+        """
+        Remove a contact by ID.
+
+        With ``if_match`` the row is locked and the contact is only removed
+        while its ETag still matches; otherwise PreconditionFailed is raised.
+        """
+        user_id = user.id
+        contact = await self.get_contact_by_id(
+            contact_id, user, for_update=if_match is not None
+        )
         if contact:
+            check_if_match(if_match, contact_etag(contact.id, contact.updated_at))
             await self.db.delete(contact)
             await self.db.commit()
+            await write_tracker.mark(user_id)
+            await contact_cache.bump(user_id)
         return contact
 
     async def update_contact(
         self, 
         contact_id: int, 
         body: ContactUpdateSchema, 
-        user: User
+        user: User,
+        if_match: str | None = None,
     ) -> Contact | None:
-        """Update a contact by ID."""
-        contact = await self.get_contact_by_id(contact_id, user)
+        """
+        Update a contact by ID.
+
+        With ``if_match`` the row is locked and the contact is only updated
+        while its ETag still matches; otherwise PreconditionFailed is raised.
+        """
+        user_id = user.id
+        contact = await self.get_contact_by_id(
+            contact_id, user, for_update=if_match is not None
+        )
         if contact:
+            check_if_match(if_match, contact_etag(contact.id, contact.updated_at))
             update_data = body.model_dump(exclude_unset=True)
 
             for key, value in update_data.items():
@@ -82,26 +188,43 @@ class ContactRepository:
 
             await self.db.commit()
             await self.db.refresh(contact)
+            await write_tracker.mark(user_id)
+            await contact_cache.bump(user_id)
 
         return contact
 
     async def search_contacts(
             self, 
             query: str, 
-            user: User
+            user: User,
+            limit: int,
+            offset: int,
     ) -> Sequence[Contact]:
-        """Search for contacts by query."""
+        """
+        Search for contacts by query.
+
+        The ILIKE predicates are served by the pg_trgm GIN indexes; results
+        are ranked by the best trigram similarity across the searched columns.
+        """
+        pattern = f"%{escape_like(query)}%"
+        rank = func.greatest(
+            func.similarity(Contact.first_name, query),
+            func.similarity(Contact.last_name, query),
+            func.similarity(Contact.email, query),
+        )
         stmt = (
             select(Contact)
             .filter_by(user_id=user.id)
             .where(
                 or_(
-                    Contact.first_name.ilike(f"%{query}%"),
-                    Contact.last_name.ilike(f"%{query}%"),
-                    Contact.email.ilike(f"%{query}%"),
+                    Contact.first_name.ilike(pattern, escape="\\"),
+                    Contact.last_name.ilike(pattern, escape="\\"),
+                    Contact.email.ilike(pattern, escape="\\"),
                 )
             )
-            .order_by(Contact.id)
+            .order_by(rank.desc(), Contact.id)
+            .offset(offset)
+            .limit(limit)
         )
         contacts = await self.db.execute(stmt)
         return contacts.scalars().all()
@@ -112,17 +235,31 @@ class ContactRepository:
         end_date: date, 
         user: User
     ) -> Sequence[Contact]:
-        """Get contacts with birthdays."""
+        """
+        Get contacts with birthdays between two dates (inclusive).
+
+        Matches on the indexed ``birthday_mmdd`` column; a window that
+        crosses the new year is split into two ranges.
+        """
+        start = start_date.month * 100 + start_date.day
+        end = end_date.month * 100 + end_date.day
+        if (end_date - start_date).days >= 365:
+            window = Contact.birthday_mmdd.is_not(None)
+        elif start <= end:
+            window = Contact.birthday_mmdd.between(start, end)
+        else:
+            window = or_(
+                Contact.birthday_mmdd >= start,
+                Contact.birthday_mmdd <= end,
+            )
         stmt = (
             select(Contact)
             .filter_by(user_id=user.id)
-            .where(
-                func.to_char(Contact.birthday, "MM-DD").between(
-                    func.to_char(start_date, "MM-DD"), 
-                    func.to_char(end_date, "MM-DD")
-                )
+            .where(window)
+            .order_by(
+                case((Contact.birthday_mmdd >= start, 0), else_=1),
+                asc(Contact.birthday_mmdd),
             )
-            .order_by(asc(func.to_char(Contact.birthday, "MM-DD")))
         )
         contacts = await self.db.execute(stmt)
-        return contacts.scalars().all()
\ No newline at end of file
+        return contacts.scalars().all()
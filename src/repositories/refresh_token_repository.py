@@ -1,15 +1,46 @@
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import select
+from sqlalchemy import (
+    DateTime,
+    String,
+    Text,
+    and_,
+    delete,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.entity.models import RefreshToken
+from src.entity.models import RefreshToken, TokenRevokeReason, User
 from src.repositories.base_repository import BaseRepository
 
 
 logger = logging.getLogger("uvicorn.error")
 
+PARTITION_PREFIX = "refresh_tokens_p"
+PARTITION_DATE_FORMAT = "%Y%m%d"
+DETACH_LOCK_TIMEOUT = "2s"
+
+
+def week_start(moment: datetime) -> datetime:
+    """Monday 00:00 UTC of the week containing moment."""
+    moment = moment.astimezone(timezone.utc)
+    return (moment - timedelta(days=moment.weekday())).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def partition_name(lower: datetime) -> str:
+    """Name of the weekly partition starting at lower."""
+    return f"{PARTITION_PREFIX}{lower.strftime(PARTITION_DATE_FORMAT)}"
+
 
 class RefreshTokenRepository(BaseRepository):
     """Refresh token repository."""
@@ -53,6 +84,218 @@ class RefreshTokenRepository(BaseRepository):
         return await self.create(refresh_token)
 
     async def revoke_token(self, refresh_token: RefreshToken) -> None:
-        """Revoke token."""
+        """Revoke token on logout."""
         refresh_token.revoked_at = datetime.now()
-        await self.db.commit()
\ No newline at end of file
+        refresh_token.revoked_reason = TokenRevokeReason.LOGOUT.value
+        await self.db.commit()
+
+    async def rotate_token(
+        self,
+        token_hash: str,
+        new_token_hash: str,
+        expired_at: datetime,
+        ip_address: str | None,
+        user_agent: str | None,
+        current_time: datetime,
+    ) -> Row | None:
+        """
+        Revoke an active token and issue its replacement atomically.
+
+        One statement: the UPDATE ... RETURNING of the old token feeds the
+        INSERT of the new one, which is joined to its user. Returns the
+        (id, username) row of the owner, or None if the token was not active.
+        """
+        revoked = (
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.expired_at > current_time,
+                RefreshToken.revoked_at.is_(None),
+            )
+            .values(
+                revoked_at=datetime.now(),
+                revoked_reason=TokenRevokeReason.ROTATED.value,
+            )
+            .returning(RefreshToken.user_id)
+            .cte("revoked")
+        )
+        issued = (
+            insert(RefreshToken)
+            .from_select(
+                ["user_id", "token_hash", "expired_at", "ip_address", "user_agent"],
+                select(
+                    revoked.c.user_id,
+                    literal(new_token_hash, String),
+                    literal(expired_at, DateTime(timezone=True)),
+                    literal(ip_address, String),
+                    literal(user_agent, Text),
+                ),
+            )
+            .returning(RefreshToken.user_id)
+            .cte("issued")
+        )
+        stmt = select(User.id, User.username).join(
+            issued, issued.c.user_id == User.id
+        )
+        owner = (await self.db.execute(stmt)).first()
+        await self.db.commit()
+        return owner
+
+    async def revoke_user_tokens(self, user_id: int) -> None:
+        """Revoke every active token of a user after a detected reuse."""
+        await self.db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.user_id == user_id,
+                RefreshToken.revoked_at.is_(None),
+            )
+            .values(
+                revoked_at=datetime.now(),
+                revoked_reason=TokenRevokeReason.REUSE.value,
+            )
+        )
+        await self.db.commit()
+
+    async def delete_expired_batch(
+        self, current_time: datetime, cutoff: datetime, batch_size: int
+    ) -> int:
+        """Delete up to batch_size expired tokens and commit."""
+        expired = (
+            select(RefreshToken.id)
+            .where(
+                or_(
+                    RefreshToken.expired_at < current_time,
+                    and_(
+                        RefreshToken.revoked_at.is_not(None),
+                        RefreshToken.expired_at < cutoff,
+                    ),
+                )
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.id.in_(expired.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def ensure_partitions(
+        self, current_time: datetime, weeks_ahead: int
+    ) -> list[str]:
+        """
+        Create the weekly partitions from this week to weeks_ahead.
+
+        A partition whose range already has rows in the default partition
+        is created standalone, filled with those rows and then attached.
+        Each partition is its own transaction; a failure is logged and the
+        remaining weeks are still created.
+        """
+        existing = set(await self._partition_names())
+        created = []
+        lower = week_start(current_time)
+        for _ in range(weeks_ahead + 1):
+            upper = lower + timedelta(weeks=1)
+            name = partition_name(lower)
+            if name not in existing:
+                try:
+                    await self._create_partition(name, lower, upper)
+                    await self.db.commit()
+                    created.append(name)
+                except SQLAlchemyError as e:
+                    await self.db.rollback()
+                    logger.error(f"Creating partition {name} failed: {e}")
+            lower = upper
+        return created
+
+    async def _create_partition(
+        self, name: str, lower: datetime, upper: datetime
+    ) -> None:
+        """Create the partition for [lower, upper), moving stray default rows."""
+        bounds = {"lower": lower, "upper": upper}
+        values = (
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        stray = await self.db.scalar(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM refresh_tokens_default "
+                "WHERE expired_at >= :lower AND expired_at < :upper)"
+            ),
+            bounds,
+        )
+        if not stray:
+            await self.db.execute(
+                text(f"CREATE TABLE {name} PARTITION OF refresh_tokens {values}")
+            )
+            return
+
+        await self.db.execute(
+            text(
+                f"CREATE TABLE {name} "
+                f"(LIKE refresh_tokens INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+        )
+        moved = await self.db.execute(
+            text(
+                f"WITH moved AS ("
+                f"DELETE FROM refresh_tokens_default "
+                f"WHERE expired_at >= :lower AND expired_at < :upper "
+                f"RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            ),
+            bounds,
+        )
+        await self.db.execute(
+            text(f"ALTER TABLE refresh_tokens ATTACH PARTITION {name} {values}")
+        )
+        logger.warning(
+            f"Moved {moved.rowcount} refresh tokens from the default partition "
+            f"into {name}"
+        )
+
+    async def drop_expired_partitions(self, current_time: datetime) -> list[str]:
+        """
+        Detach and drop the weekly partitions whose tokens have all expired.
+
+        PostgreSQL does not allow DETACH ... CONCURRENTLY while the table has
+        a default partition, so the detach waits at most
+        DETACH_LOCK_TIMEOUT for its lock instead of queueing in front of
+        every token query. A partition that cannot be detached now is left
+        for the next run.
+        """
+        dropped = []
+        for name in await self._partition_names():
+            lower = datetime.strptime(
+                name[len(PARTITION_PREFIX):], PARTITION_DATE_FORMAT
+            ).replace(tzinfo=timezone.utc)
+            if lower + timedelta(weeks=1) > current_time:
+                continue
+            try:
+                await self.db.execute(
+                    text(f"SET LOCAL lock_timeout = '{DETACH_LOCK_TIMEOUT}'")
+                )
+                await self.db.execute(
+                    text(f"ALTER TABLE refresh_tokens DETACH PARTITION {name}")
+                )
+                await self.db.execute(text(f"DROP TABLE {name}"))
+                await self.db.commit()
+                dropped.append(name)
+            except SQLAlchemyError as e:
+                await self.db.rollback()
+                logger.warning(f"Dropping partition {name} postponed: {e}")
+        return dropped
+
+    async def _partition_names(self) -> list[str]:
+        """Names of the weekly partitions of refresh_tokens."""
+        result = await self.db.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'refresh_tokens'::regclass "
+                "AND c.relname LIKE :prefix ORDER BY c.relname"
+            ),
+            {"prefix": f"{PARTITION_PREFIX}%"},
+        )
+        return list(result.scalars().all())
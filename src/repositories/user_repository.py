@@ -1,9 +1,15 @@
 import logging
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.entity.models import User
+from src.core.user_cache import (
+    UserCache,
+    attach_user,
+    serialize_user,
+    user_cache,
+)
+from src.entity.models import User, UserRole
 from src.repositories.base_repository import BaseRepository
 from src.schemas.user_schema import UserCreate
 
@@ -12,14 +18,34 @@ logger = logging.getLogger("uvicorn.error")
 
 class UserRepository(BaseRepository):
     """User repository."""
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, cache: UserCache = user_cache):
         super().__init__(session, User)
+        self.cache = cache
 
     async def get_by_username(self, username: str) -> User | None:
         """Get user by username."""
         stmt = select(self.model).where(User.username == username)
         user = await self.db.execute(stmt)
         return user.scalar_one_or_none()
+
+
+    async def get_cached_by_username(self, username: str) -> User | None:
+        """Get user by username, served from the user cache when possible."""
+        data = await self.cache.get(username)
+        if data is not None:
+            return await attach_user(self.db, data)
+        user = await self.get_by_username(username)
+        if user is not None:
+            await self.cache.set(user)
+        return user
+    
+
+    async def get_credentials(self, username: str) -> dict | None:
+        """Get user data, password hash included, as a plain dict."""
+        user = await self.get_by_username(username)
+        if user is None:
+            return None
+        return serialize_user(user, with_password=True)
     
 
     async def get_user_by_email(self, email: str) -> User | None:
@@ -47,8 +73,10 @@ class UserRepository(BaseRepository):
     async def confirmed_email(self, email: str) -> None:
         """Confirmed email."""
         user = await self.get_user_by_email(email)
+        username = user.username
         user.confirmed = True
         await self.db.commit()
+        await self.cache.invalidate(username)
 
     
     async def update_avatar_url(self, email: str, url: str) -> User:
@@ -57,4 +85,44 @@ class UserRepository(BaseRepository):
         user.avatar = url
         await self.db.commit()
         await self.db.refresh(user)
+        await self.cache.invalidate(user.username)
+        return user
+
+
+    async def set_default_avatar_url(self, email: str, url: str) -> bool:
+        """
+        Set the avatar URL only if the user has no avatar yet.
+
+        One conditional UPDATE, so an avatar uploaded in the meantime is
+        never overwritten. Returns whether the avatar was set.
+        """
+        result = await self.db.execute(
+            update(User)
+            .where(User.email == email, User.avatar.is_(None))
+            .values(avatar=url)
+            .returning(User.username)
+        )
+        username = result.scalar_one_or_none()
+        await self.db.commit()
+        if username is None:
+            return False
+        await self.cache.invalidate(username)
+        return True
+
+
+    async def update_password_hash(self, user: User, hashed_password: str) -> User:
+        """Update password hash."""
+        user.hash_password = hashed_password
+        await self.db.commit()
+        await self.db.refresh(user)
+        return user
+
+
+    async def update_role(self, email: str, role: UserRole) -> User:
+        """Update user role."""
+        user = await self.get_user_by_email(email)
+        user.role = role
+        await self.db.commit()
+        await self.db.refresh(user)
+        await self.cache.invalidate(user.username)
         return user
\ No newline at end of file
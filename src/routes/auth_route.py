@@ -10,11 +10,14 @@ from fastapi import (
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config.config import settings
+from src.core.depend_service import rate_limit
 from src.database.db import get_db
 from src.services.auth_services import AuthService, oauth2_scheme
 from src.schemas.token import TokenResponse, RefreshTokenRequest
 from src.schemas.user_schema import UserCreate, UserResponse
 from src.services.email_services import send_email
+from src.services.user_services import resolve_gravatar
 
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -26,7 +29,11 @@ def get_user_service(db: AsyncSession = Depends(get_db)):
     return AuthService(db)
 
 
-@router.post("/register", response_model=UserResponse)
+@router.post(
+    "/register",
+    response_model=UserResponse,
+    dependencies=[Depends(rate_limit("auth.register"))],
+)
 async def register(
     user_data: UserCreate,
     background_tasks: BackgroundTasks,
@@ -35,6 +42,8 @@ async def register(
 ):
     """Register user and send email."""
     user = await auth_service.register_user(user_data)
+    if settings.GRAVATAR_CHECK_ENABLED:
+        background_tasks.add_task(resolve_gravatar, user.email)
     background_tasks.add_task(
         send_email, 
         user_data.email, 
@@ -44,7 +53,11 @@ async def register(
     return user
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limit("auth.login"))],
+)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     request: Request = None,
@@ -53,9 +66,10 @@ async def login(
     """Login user."""
     user = await auth_service.authenticate(
         form_data.username,
-        form_data.password
+        form_data.password,
+        ip_address=request.client.host if request else None,
     )
-    access_token = await auth_service.create_access_token(user.username)
+    access_token = auth_service.create_access_token(user.username, user.id)
     refresh_token = await auth_service.create_refresh_token(
         user.id,
         ip_address=request.client.host if request else None,
@@ -68,25 +82,23 @@ async def login(
     )
 
 
-@router.post("/refresh", response_model=TokenResponse)
+@router.post(
+    "/refresh",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limit("auth.refresh"))],
+)
 async def refresh(
     refresh_token: RefreshTokenRequest,
     request: Request = None,
     auth_service: AuthService = Depends(get_user_service),
 ):
     """Refresh token."""
-    user = await auth_service.validate_refresh_token(
-        refresh_token.refresh_token
-    )
-
-    new_access_token = auth_service.create_access_token(user.username)
-    new_refresh_token = await auth_service.create_refresh_token(
-        user.id,
+    owner, new_refresh_token = await auth_service.rotate_refresh_token(
+        refresh_token.refresh_token,
         ip_address=request.client.host if request else None,
         user_agent=request.headers.get("user-agent") if request else None,
     )
-
-    await auth_service.revoke_refresh_token(refresh_token.refresh_token)
+    new_access_token = auth_service.create_access_token(owner.username, owner.id)
 
     return TokenResponse(
         access_token=new_access_token,
@@ -1,29 +1,74 @@
 import logging
-
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import date
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    status,
+    Query,
+    Response,
+    UploadFile,
+    File,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.db import get_db
+from src.database.db import get_db, write_tracker
 from src.services.contact_services import ContactService
+from src.services.contact_import_services import ContactImportService
+from src.services.contact_export_services import ContactExportService
 from src.schemas.contact_schema import (
     ContactSchema, 
     ContactResponse, 
-    ContactUpdateSchema
+    ContactUpdateSchema,
+    ContactFileFormat,
+    ContactImportReport,
     )
 from src.config import messages
-from src.core.depend_service import get_current_user
+from src.config.config import settings
+from src.core.contact_cache import contact_cache
+from src.core.depend_service import (
+    get_current_user,
+    get_read_db,
+    user_rate_limit,
+)
+from src.core.etag import (
+    PreconditionFailed,
+    contact_etag,
+    etag_matches,
+    not_modified,
+    precondition_failed,
+    set_etag,
+)
+from src.core.query_budget import query_budget
 from src.entity.models import User
 
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 logger = logging.getLogger("uvicorn.error")
 
+# Loading the user on a cache miss, then one query for the contacts.
+READ_QUERY_BUDGET = 2
+# Plus the version query that the ETag of a single contact is derived from.
+CONDITIONAL_READ_QUERY_BUDGET = READ_QUERY_BUDGET + 1
 
-@router.get("/", response_model=list[ContactResponse])
+
+@router.get(
+    "/",
+    response_model=list[ContactResponse],
+    dependencies=[
+        Depends(query_budget(READ_QUERY_BUDGET)),
+        Depends(user_rate_limit("contacts.list")),
+    ],
+)
 async def get_contacts(
     limit: int = Query(10, ge=1, le=500),
     offset: int = Query(0, ge=0),
-    db: AsyncSession = Depends(get_db),
+    after: str | None = Query(None, max_length=64),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user)
 ):
     """
@@ -32,25 +77,78 @@ async def get_contacts(
     Args:
         limit (int): The maximum number of contacts to retrieve.
         offset (int): The number of contacts to skip.
+        after (str): Opaque cursor from the X-Next-Cursor header of the
+            previous page. When given, offset is ignored.
+        if_none_match (str): ETag of a cached page; 304 if still current.
         db (AsyncSession): The database session dependency.
 
     Returns:
         list[ContactResponse]: A list of contacts.
     """
     contact_service = ContactService(db)
-    return await contact_service.get_contacts(limit, offset, user)
+
+    async def load():
+        contacts, next_cursor = await contact_service.get_contacts(
+            limit, offset, user, after
+        )
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor is not None else {}
+        return contacts, headers
+
+    return await contact_cache.respond(
+        user.id,
+        "list",
+        {"limit": limit, "offset": offset, "after": after},
+        if_none_match,
+        load,
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    dependencies=[Depends(user_rate_limit("contacts.export"))],
+)
+async def export_contacts(
+    file_format: ContactFileFormat = Query(
+        ContactFileFormat.NDJSON, alias="format"
+    ),
+    user: User = Depends(get_current_user)
+):
+    """
+    Stream all contacts of the user as NDJSON or CSV.
+
+    Args:
+        file_format (ContactFileFormat): The export format.
+
+    Returns:
+        StreamingResponse: The contacts, one per line.
+    """
+    use_primary = await write_tracker.recent(user.id)
+    export_service = ContactExportService(user, file_format, use_primary)
+    return StreamingResponse(
+        export_service.export(),
+        media_type=export_service.media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{export_service.filename}"'
+            )
+        },
+    )
 
 
 @router.get(
     "/{contact_id}",
     response_model=ContactResponse,
+    dependencies=[Depends(query_budget(CONDITIONAL_READ_QUERY_BUDGET))],
     name="Get contact by id",
     description="Description of the endpoint",
     response_description="Response description",
 )
 async def get_contact(
     contact_id: int, 
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user)
 ):
     """
@@ -58,24 +156,34 @@ async def get_contact(
 
     Args:
         contact_id (int): The ID of the contact to retrieve.
+        if_none_match (str): ETag of a cached copy; 304 if still current.
         db (AsyncSession): The database session dependency.
 
     Returns:
         ContactResponse: The retrieved contact.
     """
     contact_service = ContactService(db)
+    if if_none_match is not None:
+        etag = await contact_service.get_contact_etag(contact_id, user)
+        if etag is not None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
     contact = await contact_service.get_contact(contact_id, user)
     if not contact:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=messages.contact_not_found.get("ua"),
+            detail=messages.contact_not_found.get("en"),
         )
+    set_etag(response, contact_etag(contact.id, contact.updated_at))
     return contact
 
 
 @router.get(
     "/search/",
     response_model=list[ContactResponse],
+    dependencies=[
+        Depends(query_budget(READ_QUERY_BUDGET)),
+        Depends(user_rate_limit("contacts.search")),
+    ],
     description=messages.contact_search_description.get("ua"),
 )
 async def search_contacts(
@@ -86,7 +194,10 @@ async def search_contacts(
         example="John Doe", 
         description=messages.contact_search_description.get("ua")
         ),
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user)
 ):
     """
@@ -94,35 +205,66 @@ async def search_contacts(
 
     Args:
         query (str): The search query.
+        limit (int): The maximum number of contacts to retrieve.
+        offset (int): The number of ranked contacts to skip.
+        if_none_match (str): ETag of cached results; 304 if still current.
         db (AsyncSession): The database session dependency.
 
     Returns:
-        list[ContactResponse]: A list of contacts that match the search query.
+        list[ContactResponse]: A list of contacts that match the search query,
+            best matches first.
     """
     contact_service = ContactService(db)
-    return await contact_service.search_contacts(query, user)
+
+    async def load():
+        return await contact_service.search_contacts(query, user, limit, offset), {}
+
+    return await contact_cache.respond(
+        user.id,
+        "search",
+        {"query": query, "limit": limit, "offset": offset},
+        if_none_match,
+        load,
+    )
 
 
 @router.get(
     "/upcoming_birthdays/",
     response_model=list[ContactResponse],
-    description="Retrieve contacts with birthdays in the next 7 days.",
+    dependencies=[Depends(query_budget(READ_QUERY_BUDGET))],
+    description="Retrieve contacts with birthdays in the next days.",
 )
 async def get_upcoming_birthdays(
-    db: AsyncSession = Depends(get_db),
+    days: int = Query(settings.BIRTHDAY_WINDOW_DAYS, ge=0, le=366),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user)
 ):
     """
-    Retrieve contacts who have birthdays within the next 7 days.
+    Retrieve contacts who have birthdays within the next days.
 
     Args:
+        days (int): Days ahead of today to include; the window runs from
+            today through today + days, so the default 7 covers 8 dates.
+        if_none_match (str): ETag of cached results; 304 if still current.
         db (AsyncSession): The database session dependency.
 
     Returns:
         list[ContactResponse]: A list of contacts with upcoming birthdays.
     """
     contact_service = ContactService(db)
-    return await contact_service.upcoming_birthdays(user)
+
+    async def load():
+        return await contact_service.upcoming_birthdays(user, days), {}
+
+    # The window moves with the date, so today is part of the cache key.
+    return await contact_cache.respond(
+        user.id,
+        "birthdays",
+        {"days": days, "today": date.today()},
+        if_none_match,
+        load,
+    )
 
 
 @router.post(
@@ -149,10 +291,39 @@ async def create_contact(
     return await contact_service.create_contact(body, user)
 
 
+@router.post(
+    "/import",
+    response_model=ContactImportReport,
+    dependencies=[Depends(user_rate_limit("contacts.import"))],
+)
+async def import_contacts(
+    file: UploadFile = File(),
+    file_format: ContactFileFormat | None = Query(None, alias="format"),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """
+    Import contacts from a CSV or NDJSON file.
+
+    Args:
+        file (UploadFile): The file with one contact per row or line.
+        file_format (ContactFileFormat): The file format. Detected from the
+            file name or content type when omitted.
+        db (AsyncSession): The database session dependency.
+
+    Returns:
+        ContactImportReport: Counters and the per-row errors.
+    """
+    import_service = ContactImportService(db)
+    return await import_service.import_contacts(file, file_format, user)
+
+
 @router.put("/{contact_id}", response_model=ContactResponse)
 async def update_contact(
     contact_id: int, 
     body: ContactUpdateSchema, 
+    response: Response,
+    if_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
@@ -162,24 +333,32 @@ async def update_contact(
     Args:
         contact_id (int): The ID of the contact to update.
         body (ContactUpdateSchema): The updated contact data.
+        if_match (str): ETag the contact must still have; 412 otherwise.
         db (AsyncSession): The database session dependency.
 
     Returns:
         ContactResponse: The updated contact.
     """
     contact_service = ContactService(db)
-    contact = await contact_service.update_contact(contact_id, body, user)
+    try:
+        contact = await contact_service.update_contact(
+            contact_id, body, user, if_match
+        )
+    except PreconditionFailed as e:
+        raise precondition_failed(e)
     if not contact:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=messages.contact_not_found.get("ua"),
+            detail=messages.contact_not_found.get("en"),
         )
+    set_etag(response, contact_etag(contact.id, contact.updated_at))
     return contact
 
 
 @router.delete("/{contact_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_contact(
     contact_id: int, 
+    if_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db), 
     user: User = Depends(get_current_user)
 ):
@@ -188,16 +367,20 @@ async def delete_contact(
 
     Args:
         contact_id (int): The ID of the contact to delete.
+        if_match (str): ETag the contact must still have; 412 otherwise.
         db (AsyncSession): The database session dependency.
 
     Returns:
         None
     """
     contact_service = ContactService(db)
-    contact = await contact_service.remove_contact(contact_id, user)
+    try:
+        contact = await contact_service.remove_contact(contact_id, user, if_match)
+    except PreconditionFailed as e:
+        raise precondition_failed(e)
     if not contact:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=messages.contact_not_found.get("ua"),
+            detail=messages.contact_not_found.get("en"),
         )
     return None
\ No newline at end of file
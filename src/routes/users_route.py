@@ -2,47 +2,41 @@ from fastapi import (
     APIRouter,
     Depends,
     Request,
+    Response,
     HTTPException,
     status,
-    BackgroundTasks,
     UploadFile,
     File,
 )
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-
-from src.services.auth_services import AuthService, oauth2_scheme
-from src.schemas.user_schema import UserResponse
+from src.schemas.user_schema import (
+    AvatarJobResponse,
+    AvatarJobStatus,
+    UserResponse,
+)
 from src.entity.models import User
 from src.config import messages
 from src.core.depend_service import (
-    get_auth_service,
     get_current_admin_user,
     get_current_moderator_user,
     get_user_service,
     get_current_user,
+    rate_limit,
+    rate_limited_user,
 )
 from src.services.user_services import UserService
-from src.schemas.email_schema import RequestEmail
-from src.services.email_services import send_email
+from src.schemas.email_schema import RequestEmail, RequestEmailResponse
+from src.services.email_services import send_email, verification_emails
 from src.core.email_token import get_email_from_token
-from src.services.upload_file_services import UploadFileService
-from src.config.config import settings
+from src.services.avatar_services import avatar_pipeline
 
 
 router = APIRouter(prefix="/users", tags=["users"])
-limiter = Limiter(key_func=get_remote_address)
 
 
 @router.get("/me", response_model=UserResponse)
-@limiter.limit("10/minute")
-async def me(
-    request: Request,
-    token: str = Depends(oauth2_scheme),
-    auth_service: AuthService = Depends(get_auth_service),
-):
+async def me(user: User = Depends(rate_limited_user("users.me"))):
     """Get current user."""
-    return await auth_service.get_current_user(token)
+    return user
 
 
 @router.get("/confirmed_email/{token}")
@@ -63,26 +57,39 @@ async def confirmed_email(
     return {"message": messages.email_confirmed.get("en")}
 
 
-@router.post("/request_email")
+@router.post(
+    "/request_email",
+    response_model=RequestEmailResponse,
+    dependencies=[Depends(rate_limit("users.request_email"))],
+)
 async def request_email(
     body: RequestEmail,
-    background_tasks: BackgroundTasks,
     request: Request,
     user_service: UserService = Depends(get_user_service),
 ):
     """Request email."""
-    user = await user_service.get_user_by_email(str(body.email))
+    email = str(body.email)
+    reserved, cooldown, token = await verification_emails.reserve(email)
+    if not reserved:
+        return RequestEmailResponse(
+            message=messages.email_confirm_request.get("en"), cooldown=cooldown
+        )
 
-    if user.confirmed:
-        return {"message": messages.email_already_confirmed.get("en")}
-    if user:
-        background_tasks.add_task(
-            send_email, 
-            user.email, 
-            user.username, 
-            str(request.base_url)
+    user = await user_service.get_user_by_email(email)
+    if user is not None and user.confirmed:
+        return RequestEmailResponse(
+            message=messages.email_already_confirmed.get("en"), cooldown=cooldown
         )
-    return {"message": messages.email_confirm_request.get("en")}
+    if user is not None:
+        await send_email(
+            user.email,
+            user.username,
+            str(request.base_url),
+            await verification_emails.token(user.email, token),
+        )
+    return RequestEmailResponse(
+        message=messages.email_confirm_request.get("en"), cooldown=cooldown
+    )
 
 
 @router.get("/moderator")
@@ -96,20 +103,38 @@ def read_moderator(
         .format(username=current_user.username)
     }
 
-@router.patch("/avatar", response_model=UserResponse)
+@router.patch(
+    "/avatar",
+    response_model=AvatarJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def update_avatar_user(
+    request: Request,
+    response: Response,
     file: UploadFile = File(),
     user: User = Depends(get_current_user),
-    user_service: UserService = Depends(get_user_service),
 ):
-    """Update avatar user."""
-    avatar_url = UploadFileService(
-        settings.CLOUDINARY_NAME, 
-        settings.CLOUDINARY_API_KEY, 
-        settings.CLOUDINARY_API_SECRET,
-    ).upload_file(file, user.username)
-    user = await user_service.update_avatar_url(user.email, avatar_url)
-    return user
+    """Accept an avatar upload for background processing."""
+    job_id = await avatar_pipeline.submit(file, user)
+    response.headers["Location"] = str(request.url_for("avatar_job", job_id=job_id))
+    return AvatarJobResponse(job_id=job_id, status=AvatarJobStatus.PENDING)
+
+
+@router.get("/avatar/jobs/{job_id}", response_model=AvatarJobResponse)
+async def avatar_job(job_id: str, user: User = Depends(get_current_user)):
+    """Get avatar upload job status."""
+    job = await avatar_pipeline.store.get(job_id)
+    if job is None or job["username"] != user.username:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=messages.avatar_job_not_found.get("en"),
+        )
+    return AvatarJobResponse(
+        job_id=job_id,
+        status=job["status"],
+        avatar=job.get("avatar"),
+        error=job.get("error"),
+    )
 
 
 @router.get("/admin")
@@ -1,4 +1,5 @@
 from datetime import date, datetime
+from enum import Enum
 from typing import Optional
 
 from pydantic import BaseModel, Field, ConfigDict
@@ -82,9 +83,31 @@ class ContactResponse(BaseModel):
     last_name: str
     email: str
     phone: Optional[str]    
-    birthday: date    
-    additional_info: str   
+    birthday: Optional[date]
+    additional_info: Optional[str]
     created_at: datetime
     updated_at: datetime
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ContactFileFormat(str, Enum):
+    """Contact file format."""
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ContactImportError(BaseModel):
+    """Contact import row error schema."""
+    row: int
+    errors: list[str]
+
+
+class ContactImportReport(BaseModel):
+    """Contact import report schema."""
+    total: int = 0
+    created: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: list[ContactImportError] = []
+    error: Optional[str] = None
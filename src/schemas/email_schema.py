@@ -2,4 +2,9 @@ from pydantic import BaseModel, EmailStr
 
 
 class RequestEmail(BaseModel):
-    email: EmailStr
\ No newline at end of file
+    email: EmailStr
+
+
+class RequestEmailResponse(BaseModel):
+    message: str
+    cooldown: int
@@ -1,7 +1,11 @@
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
+from enum import Enum
+
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, model_validator
 
 from src.config import constants
+from src.config.config import settings
 from src.config import messages
+from src.core.gravatar import gravatar_url
 from src.entity.models import UserRole
 
 
@@ -30,4 +34,27 @@ class UserResponse(UserBase):
     role: UserRole
     avatar: str | None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+    @model_validator(mode="after")
+    def default_avatar(self):
+        """Fall back to the Gravatar of the email."""
+        if self.avatar is None:
+            self.avatar = gravatar_url(self.email, settings.GRAVATAR_DEFAULT)
+        return self
+
+
+class AvatarJobStatus(str, Enum):
+    """Avatar upload job status."""
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class AvatarJobResponse(BaseModel):
+    """Avatar upload job schema."""
+    job_id: str
+    status: AvatarJobStatus
+    avatar: str | None = None
+    error: str | None = None
@@ -1,24 +1,31 @@
 from datetime import datetime, timedelta, timezone
+import logging
 import secrets
+from uuid import uuid4
 
 import jwt
-import bcrypt
 import hashlib
-import redis.asyncio as redis
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from libgravatar import Gravatar
 
 from src.config.config import settings
 from src.config import messages
-from src.entity.models import User
+from src.core.login_guard import credentials_lookup, login_guard
+from src.core.password_hasher import password_hasher
+from src.core.rate_limiter import rate_limiter
+from src.core.token_blacklist import token_blacklist
+from src.core.user_cache import attach_user
+from src.database.db import sessionmanager
+from src.entity.models import RefreshToken, TokenRevokeReason, User
 from src.repositories.refresh_token_repository import RefreshTokenRepository
 from src.repositories.user_repository import UserRepository
 from src.schemas.user_schema import UserCreate
 
 
-redis_client = redis.from_url(settings.REDIS_URL)
+logger = logging.getLogger("uvicorn.error")
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
@@ -29,33 +36,58 @@ class AuthService:
         self.user_repository = UserRepository(self.db)
         self.refresh_token_repository = RefreshTokenRepository(self.db)
 
-    def _hash_password(self, password: str) -> str:
+    async def _hash_password(self, password: str) -> str:
         """Hash password."""
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password.encode(), salt)
-        return hashed_password.decode()
+        return await password_hasher.hash(password)
 
-    def _verify_password(
+    async def _verify_password(
         self, plain_password: str, hashed_password: str
     ) -> bool:  # noqa
         """Verify password."""
-        return bcrypt.checkpw(
-            plain_password.encode(), 
-            hashed_password.encode()
-        )
+        return await password_hasher.verify(plain_password, hashed_password)
 
 
     def _hash_token(self, token: str):  # noqa
         return hashlib.sha256(token.encode()).hexdigest()
 
-    async def authenticate(self, username: str, password: str) -> User:
+    @staticmethod
+    def _token_id(payload: dict, token: str) -> str:
+        """Blacklist id of an access token; tokens issued without jti use the token."""
+        return payload.get("jti") or token
+
+    @staticmethod
+    async def _lookup_credentials(username: str) -> dict | None:
+        """
+        Look up credentials on a session of their own.
+
+        The lookup is shared by concurrent logins, so it must not use the
+        session of the request that started it.
+        """
+        async with sessionmanager.session() as db:
+            return await UserRepository(db).get_credentials(username)
+
+    async def authenticate(
+        self, username: str, password: str, ip_address: str | None = None
+    ) -> User:
         """Authenticate user."""
-        user = await self.user_repository.get_by_username(username)
-        if not user:
+        """Reject locked out and known unknown usernames before any work."""
+        if await login_guard.check(username, ip_address):
+            await login_guard.record_failure(username, ip_address)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=messages.authenticate_wrong_user.get("en"),
             )
+        """Concurrent attempts for one username share a single lookup."""
+        credentials = await credentials_lookup.do(
+            username, lambda: self._lookup_credentials(username)
+        )
+        if credentials is None:
+            await login_guard.record_failure(username, ip_address, missing=True)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=messages.authenticate_wrong_user.get("en"),
+            )
+        user = await attach_user(self.db, credentials)
         """Check if user is confirmed."""
         if not user.confirmed:
             raise HTTPException(
@@ -63,11 +95,19 @@ class AuthService:
                 detail=messages.authentificate_email_not_confirmed.get("en"),
             )
         """Check if password is correct."""
-        if not self._verify_password(password, user.hash_password):
+        if not await self._verify_password(password, user.hash_password):
+            await login_guard.record_failure(username, ip_address)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=messages.authenticate_wrong_user.get("en"),
             )
+        await login_guard.record_success(username, ip_address)
+        """Rehash password if the bcrypt cost has changed."""
+        if password_hasher.needs_rehash(user.hash_password):
+            hashed_password = await self._hash_password(password)
+            await self.user_repository.update_password_hash(
+                user, hashed_password
+            )
 
         return user
 
@@ -84,28 +124,26 @@ class AuthService:
                 status_code=status.HTTP_409_CONFLICT,
                 detail=messages.mail_exists.get("en"),
             )
-        """User avatar."""
-        avatar = None
-        try:
-            g = Gravatar(user_data.email)
-            avatar = g.get_image()
-        except Exception as e:
-            print(e)
-
-        hashed_password = self._hash_password(user_data.password)
+        hashed_password = await self._hash_password(user_data.password)
         user = await self.user_repository.create_user(
             user_data, 
             hashed_password,
-            avatar
+            None
         )
+        await login_guard.forget_missing(user_data.username)
         return user
 
-    def create_access_token(self, username: str) -> str:
+    def create_access_token(self, username: str, user_id: int) -> str:
         """Create access token."""
         expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         expire = datetime.now(timezone.utc) + expires_delta
 
-        to_encode = {"sub": username, "exp": expire}
+        to_encode = {
+            "sub": username,
+            "uid": user_id,
+            "exp": expire,
+            "jti": uuid4().hex,
+        }
         encoded_jwt = jwt.encode(
             to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
         )
@@ -138,22 +176,48 @@ class AuthService:
                 detail=messages.invalid_token.get("en"),
             )
 
-    async def get_current_user(self, token: str = Depends(oauth2_scheme)) -> User:
-        """Get current user."""
-        if await redis_client.exists(f"bl:{token}"):
+    async def get_current_user(
+        self,
+        token: str = Depends(oauth2_scheme),
+        route: str | None = None,
+        ip_address: str | None = None,
+    ) -> User:
+        """
+        Get current user.
+
+        When a rate-limited route is given, the limit for the user and the
+        address is counted in the same Redis call as the blacklist check.
+        The user is counted by the ``uid`` claim, so a rename does not reset
+        the counter.
+        """
+        payload = self.decode_and_validate_access_token(token)
+        username = payload.get("sub")
+        token_id = self._token_id(payload, token)
+        if route is not None and rate_limiter.is_limited(route):
+            revoked = await rate_limiter.hit(
+                route,
+                user_id=payload.get("uid"),
+                ip_address=ip_address,
+                revoked_key=(
+                    token_blacklist.key(token_id)
+                    if token_blacklist.might_be_revoked(token_id)
+                    else None
+                ),
+            )
+        else:
+            revoked = await token_blacklist.is_revoked(token_id)
+        if revoked:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=messages.revoked_token.get("en"),
             )
 
-        payload = self.decode_and_validate_access_token(token)
-        username = payload.get("sub")
         if username is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=messages.validate_credentials.get("en"),
             )
-        user = await self.user_repository.get_by_username(username)
+        user = await self.user_repository.get_cached_by_username(username)
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -181,6 +245,62 @@ class AuthService:
             )
         return user
 
+    async def rotate_refresh_token(
+        self, token: str, ip_address: str | None, user_agent: str | None
+    ) -> tuple[Row, str]:
+        """
+        Exchange a refresh token for a new one.
+
+        Returns the owner's (id, username) row and the new refresh token. Presenting
+        a token that was already rotated is treated as theft and revokes
+        every token of its owner, except within
+        REFRESH_TOKEN_REUSE_GRACE_SECONDS of the rotation, where it is taken
+        for a retry or double submit and only rejected. Tokens revoked by a
+        logout are simply invalid.
+        """
+        new_token = secrets.token_urlsafe(32)
+        token_hash = self._hash_token(token)
+        current_time = datetime.now(timezone.utc)
+        owner = await self.refresh_token_repository.rotate_token(
+            token_hash,
+            self._hash_token(new_token),
+            current_time + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            ip_address,
+            user_agent,
+            current_time,
+        )
+        if owner is not None:
+            return owner, new_token
+
+        refresh_token = await self.refresh_token_repository.get_by_token_hash(
+            token_hash
+        )
+        if self._is_reuse(refresh_token):
+            await self.refresh_token_repository.revoke_user_tokens(
+                refresh_token.user_id
+            )
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=messages.reused_refresh_token.get("en"),
+            )
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=messages.invalid_refresh_token.get("en"),
+        )
+
+    @staticmethod
+    def _is_reuse(refresh_token: RefreshToken | None) -> bool:
+        """Whether a token was rotated longer ago than the grace window."""
+        if (
+            refresh_token is None
+            or refresh_token.revoked_at is None
+            or refresh_token.revoked_reason != TokenRevokeReason.ROTATED.value
+        ):
+            return False
+        # revoked_at is stored as naive local time.
+        grace = timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS)
+        return datetime.now() - refresh_token.revoked_at > grace
+
     async def revoke_refresh_token(self, token: str) -> None:
         """Revoke refresh token."""
         token_hash = self._hash_token(token)
@@ -188,7 +308,7 @@ class AuthService:
             token_hash
         )
         if refresh_token and not refresh_token.revoked_at:
-            print(f"Revoking refresh token: {token_hash}")
+            logger.info(f"Revoking refresh token {refresh_token.id}")
             await self.refresh_token_repository.revoke_token(refresh_token)
         return None
 
@@ -200,5 +320,5 @@ class AuthService:
             current_time = datetime.now(timezone.utc).timestamp()
             ttl = int(exp - current_time)
             if ttl > 0:
-                await redis_client.setex(f"bl:{token}", ttl, "1")
+                await token_blacklist.revoke(self._token_id(payload, token), ttl)
         return None
\ No newline at end of file
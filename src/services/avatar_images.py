@@ -0,0 +1,60 @@
+"""
+Avatar image processing.
+
+Runs in worker processes, so it only depends on Pillow and the standard
+library.
+"""
+import hashlib
+import io
+
+from PIL import Image, ImageOps
+
+
+DIGEST_CHUNK_SIZE = 64 * 1024
+
+
+class ImageTooLarge(ValueError):
+    """The image has more pixels than allowed."""
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(DIGEST_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def render_variants(
+    path: str, sizes: list[int], quality: int, max_pixels: int
+) -> dict[int, bytes]:
+    """
+    Decode an image and encode square WebP variants of the given sizes.
+
+    The dimensions are checked against max_pixels from the header, before
+    anything is decoded. The image is rotated according to its EXIF
+    orientation; no metadata is written to the variants.
+    """
+    try:
+        source = Image.open(path)
+    except Image.DecompressionBombError as e:
+        raise ImageTooLarge(str(e)) from None
+    with source:
+        width, height = source.size
+        if width * height > max_pixels:
+            raise ImageTooLarge(
+                f"{width}x{height} exceeds the limit of {max_pixels} pixels"
+            )
+        source.draft("RGB", (max(sizes), max(sizes)))
+        image = ImageOps.exif_transpose(source)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    variants = {}
+    for size in sizes:
+        variant = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        variant.save(buffer, "WEBP", quality=quality, method=4)
+        variants[size] = buffer.getvalue()
+    return variants
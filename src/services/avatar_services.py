@@ -0,0 +1,360 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+from uuid import uuid4
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from redis.asyncio import Redis
+
+from src.config.config import settings
+from src.config import messages
+from src.database.db import sessionmanager
+from src.database.redis_client import redis_client
+from src.entity.models import User
+from src.repositories.user_repository import UserRepository
+from src.schemas.user_schema import AvatarJobStatus
+from src.services.avatar_images import ImageTooLarge, file_digest, render_variants
+from src.services.avatar_storage import AvatarStorage, build_avatar_storage
+
+
+logger = logging.getLogger("uvicorn.error")
+
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class AvatarJob:
+    """Spooled avatar waiting for a worker."""
+    id: str
+    email: str
+    username: str
+    path: Path
+
+
+class AvatarJobStore:
+    """
+    Avatar job status, kept in Redis so that any worker can report it.
+
+    Each job records the worker that owns it; workers keep a heartbeat key
+    alive, so the jobs of a worker that stopped can be taken over.
+    """
+    prefix = "avatar:job:"
+    owner_prefix = "avatar:worker:"
+    claim_prefix = "avatar:claim:"
+
+    def __init__(self, redis: Redis, ttl: int):
+        self.redis = redis
+        self.ttl = ttl
+
+    async def create(self, job: AvatarJob, owner: str) -> None:
+        """Record a new pending job."""
+        await self.update(
+            job.id,
+            status=AvatarJobStatus.PENDING.value,
+            username=job.username,
+            email=job.email,
+            owner=owner,
+        )
+
+    async def update(self, job_id: str, **fields: str) -> None:
+        """Update job fields and refresh the expiry."""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(f"{self.prefix}{job_id}", mapping=fields)
+        pipe.expire(f"{self.prefix}{job_id}", self.ttl)
+        await pipe.execute()
+
+    async def get(self, job_id: str) -> dict | None:
+        """Get job fields."""
+        data = await self.redis.hgetall(f"{self.prefix}{job_id}")
+        if not data:
+            return None
+        return {key.decode(): value.decode() for key, value in data.items()}
+
+    async def heartbeat(self, owner: str, ttl: int) -> None:
+        """Mark a worker as alive for ttl seconds."""
+        await self.redis.set(f"{self.owner_prefix}{owner}", 1, ex=ttl)
+
+    async def is_alive(self, owner: str) -> bool:
+        """Whether a worker sent a heartbeat recently."""
+        return bool(await self.redis.exists(f"{self.owner_prefix}{owner}"))
+
+    async def claim(self, job_id: str, owner: str, ttl: int) -> bool:
+        """Take over a job; only one worker wins within ttl seconds."""
+        return bool(
+            await self.redis.set(
+                f"{self.claim_prefix}{job_id}", owner, nx=True, ex=ttl
+            )
+        )
+
+
+def spool_upload(source: BinaryIO, path: Path, max_bytes: int) -> None:
+    """Copy an upload to the spool, rejecting files over max_bytes."""
+    size = 0
+    with path.open("wb") as target:
+        while chunk := source.read(SPOOL_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                break
+            target.write(chunk)
+    if size > max_bytes:
+        path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=messages.avatar_too_large.get("en"),
+        )
+
+
+class AvatarPipeline:
+    """
+    Background avatar processing.
+
+    Requests only spool the upload to disk and enqueue a job; a pool of
+    worker tasks has the image resized in a process pool, stores the
+    variants under the hash of the upload and updates the user's avatar
+    URL. Re-uploading an image that is already stored skips the resizing.
+
+    The queue lives in memory, so jobs spooled by a worker that stopped are
+    picked up again from the spool directory by a live worker.
+    """
+    def __init__(
+        self,
+        store: AvatarJobStore,
+        storage: AvatarStorage,
+        spool_dir: Path,
+        workers: int,
+        process_workers: int,
+        queue_size: int,
+        max_bytes: int,
+        max_pixels: int,
+        sizes: list[int],
+        quality: int,
+        heartbeat_ttl: int = 30,
+    ):
+        self.store = store
+        self.storage = storage
+        self.spool_dir = spool_dir
+        self.workers = workers
+        self.process_workers = process_workers
+        self.max_bytes = max_bytes
+        self.max_pixels = max_pixels
+        self.sizes = sorted(sizes, reverse=True)
+        self.quality = quality
+        self.heartbeat_ttl = heartbeat_ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.queue: asyncio.Queue[AvatarJob] = asyncio.Queue(queue_size)
+        self._tasks: list[asyncio.Task] = []
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def start(self) -> None:
+        """Start the image process pool and the worker tasks."""
+        await run_in_threadpool(self.spool_dir.mkdir, parents=True, exist_ok=True)
+        self._start_executor()
+        self._tasks = [
+            asyncio.create_task(self._work()) for _ in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    def _start_executor(self) -> None:
+        """Create the image process pool."""
+        # Forking a process with running threads (bcrypt, threadpool, Redis)
+        # can deadlock the children; spawned workers start clean.
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.process_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    async def stop(self) -> None:
+        """Stop the worker tasks and the process pool."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @staticmethod
+    def variant_key(digest: str, size: int) -> str:
+        """Storage key of one variant of the image with the given digest."""
+        return f"{digest[:2]}/{digest}_{size}.webp"
+
+    async def submit(self, file: UploadFile, user: User) -> str:
+        """Spool an uploaded avatar and enqueue it; returns the job id."""
+        if not (file.content_type or "").startswith("image/"):
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=messages.avatar_unsupported_type.get("en"),
+            )
+        if self.queue.full():
+            self._raise_busy()
+
+        job_id = uuid4().hex
+        job = AvatarJob(job_id, user.email, user.username, self.spool_dir / job_id)
+        await run_in_threadpool(spool_upload, file.file, job.path, self.max_bytes)
+        await self.store.create(job, self.owner)
+        if not await self._enqueue(job):
+            self._raise_busy()
+        return job.id
+
+    async def _enqueue(self, job: AvatarJob) -> bool:
+        """Queue a spooled job, failing it when the queue is full."""
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            await run_in_threadpool(job.path.unlink, missing_ok=True)
+            await self.store.update(
+                job.id,
+                status=AvatarJobStatus.FAILED.value,
+                error=messages.avatar_queue_full.get("en"),
+            )
+            return False
+        return True
+
+    async def _heartbeat(self) -> None:
+        """Keep this worker marked alive and adopt orphaned jobs."""
+        while True:
+            try:
+                await self.store.heartbeat(self.owner, self.heartbeat_ttl)
+                await self.recover()
+            except Exception as e:
+                logger.warning(f"Avatar worker heartbeat failed: {e}")
+            await asyncio.sleep(self.heartbeat_ttl / 3)
+
+    async def recover(self) -> int:
+        """
+        Re-enqueue spooled jobs whose worker stopped; returns their number.
+
+        Spool files without a job record are uploads that never got queued
+        and are removed once older than the job TTL.
+        """
+        recovered = 0
+        for path in await run_in_threadpool(list, self.spool_dir.iterdir()):
+            job = await self.store.get(path.name)
+            if job is None:
+                try:
+                    stat = await run_in_threadpool(path.stat)
+                except FileNotFoundError:
+                    continue
+                if time.time() - stat.st_mtime > self.store.ttl:
+                    await run_in_threadpool(path.unlink, missing_ok=True)
+                continue
+            if job.get("owner") == self.owner or await self.store.is_alive(
+                job.get("owner", "")
+            ):
+                continue
+            if not await self.store.claim(path.name, self.owner, self.store.ttl):
+                continue
+            if job["status"] in (
+                AvatarJobStatus.DONE.value, AvatarJobStatus.FAILED.value
+            ) or "email" not in job:
+                await run_in_threadpool(path.unlink, missing_ok=True)
+                if "email" not in job:
+                    await self.store.update(
+                        path.name, status=AvatarJobStatus.FAILED.value
+                    )
+                continue
+            await self.store.update(
+                path.name, status=AvatarJobStatus.PENDING.value, owner=self.owner
+            )
+            if await self._enqueue(
+                AvatarJob(path.name, job["email"], job["username"], path)
+            ):
+                recovered += 1
+        if recovered:
+            logger.info(f"Recovered {recovered} avatar jobs")
+        return recovered
+
+    @staticmethod
+    def _raise_busy() -> None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=messages.avatar_queue_full.get("en"),
+        )
+
+    async def _work(self) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._process(job)
+            finally:
+                self.queue.task_done()
+
+    async def _process(self, job: AvatarJob) -> None:
+        """Store one avatar and point the user at it."""
+        await self.store.update(job.id, status=AvatarJobStatus.PROCESSING.value)
+        try:
+            url = await self._store_variants(job.path)
+            async with sessionmanager.session() as db:
+                await UserRepository(db).update_avatar_url(job.email, url)
+        except ImageTooLarge as e:
+            logger.warning(f"Avatar job {job.id} rejected: {e}")
+            await self.store.update(
+                job.id,
+                status=AvatarJobStatus.FAILED.value,
+                error=messages.avatar_too_many_pixels.get("en"),
+            )
+        except Exception as e:
+            logger.error(f"Avatar job {job.id} failed: {e}", exc_info=True)
+            await self.store.update(
+                job.id, status=AvatarJobStatus.FAILED.value, error=str(e)
+            )
+        else:
+            await self.store.update(
+                job.id, status=AvatarJobStatus.DONE.value, avatar=url
+            )
+        finally:
+            await run_in_threadpool(job.path.unlink, missing_ok=True)
+
+    async def _store_variants(self, path: Path) -> str:
+        """Resize and store the image unless already stored; returns its URL."""
+        digest = await run_in_threadpool(file_digest, str(path))
+        keys = {size: self.variant_key(digest, size) for size in self.sizes}
+        if not await self.storage.exists(keys[self.sizes[-1]]):
+            variants = await self._render(path)
+            # The smallest variant is written last and marks a complete set.
+            for size in self.sizes:
+                await self.storage.put(keys[size], variants[size], "image/webp")
+        return self.storage.url(keys[self.sizes[0]])
+
+    async def _render(self, path: Path) -> dict[int, bytes]:
+        """Render the variants in the process pool."""
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor,
+                render_variants,
+                str(path),
+                self.sizes,
+                self.quality,
+                self.max_pixels,
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); replace the pool once
+            # so that the following jobs do not fail as well.
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._start_executor()
+            raise
+
+
+avatar_pipeline = AvatarPipeline(
+    AvatarJobStore(redis_client, settings.AVATAR_JOB_TTL),
+    build_avatar_storage(),
+    spool_dir=Path(settings.AVATAR_SPOOL_DIR),
+    workers=settings.AVATAR_WORKERS,
+    process_workers=settings.AVATAR_PROCESS_WORKERS,
+    queue_size=settings.AVATAR_QUEUE_SIZE,
+    max_bytes=settings.AVATAR_MAX_BYTES,
+    max_pixels=settings.AVATAR_MAX_PIXELS,
+    sizes=settings.AVATAR_SIZES,
+    quality=settings.AVATAR_WEBP_QUALITY,
+)
@@ -0,0 +1,149 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.staticfiles import StaticFiles
+
+from src.config.config import settings
+from src.services.upload_file_services import UploadFileService
+
+try:
+    import boto3
+except ImportError:  # pragma: no cover - optional dependency
+    boto3 = None
+
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """Static files that never change under the same path."""
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+
+class AvatarStorage(ABC):
+    """
+    Content-addressed avatar storage backend.
+
+    Keys are derived from the image content, so an object is never
+    overwritten and can be cached forever.
+    """
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Whether an object is stored under key."""
+        ...
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes, content_type: str) -> None:
+        """Store an object under key."""
+        ...
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """Public URL of the object stored under key."""
+        ...
+
+
+class LocalAvatarStorage(AvatarStorage):
+    """Stores avatars in a directory served by the app."""
+    def __init__(self, root: Path, base_url: str):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    async def exists(self, key: str) -> bool:
+        return await run_in_threadpool((self.root / key).is_file)
+
+    async def put(self, key: str, data: bytes, content_type: str) -> None:
+        await run_in_threadpool(self._write, self.root / key, data)
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f".{path.name}.partial")
+        partial.write_bytes(data)
+        partial.replace(path)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class S3AvatarStorage(AvatarStorage):
+    """Stores avatars in an S3-compatible bucket."""
+    def __init__(self, client, bucket: str, public_url: str):
+        self.client = client
+        self.bucket = bucket
+        self.public_url = public_url.rstrip("/")
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await run_in_threadpool(self.client.head_object, Bucket=self.bucket, Key=key)
+        except self.client.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return False
+            raise
+        return True
+
+    async def put(self, key: str, data: bytes, content_type: str) -> None:
+        await run_in_threadpool(
+            self.client.put_object,
+            Bucket=self.bucket,
+            Key=key,
+            Body=data,
+            ContentType=content_type,
+            CacheControl=IMMUTABLE_CACHE_CONTROL,
+        )
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+
+class CloudinaryAvatarStorage(AvatarStorage):
+    """Stores avatars in Cloudinary."""
+    def __init__(self, uploader: UploadFileService):
+        self.uploader = uploader
+
+    async def exists(self, key: str) -> bool:
+        return await run_in_threadpool(self.uploader.exists, self._public_id(key))
+
+    async def put(self, key: str, data: bytes, content_type: str) -> None:
+        await run_in_threadpool(self.uploader.upload_bytes, data, self._public_id(key))
+
+    def url(self, key: str) -> str:
+        return self.uploader.build_url(self._public_id(key))
+
+    @staticmethod
+    def _public_id(key: str) -> str:
+        return f"RestApp/{key.rsplit('.', 1)[0]}"
+
+
+def build_avatar_storage() -> AvatarStorage:
+    """Avatar storage backend from settings."""
+    if settings.AVATAR_STORAGE == "local":
+        return LocalAvatarStorage(
+            Path(settings.AVATAR_LOCAL_DIR), settings.AVATAR_LOCAL_URL
+        )
+    if settings.AVATAR_STORAGE == "s3":
+        if boto3 is None:
+            raise RuntimeError(
+                "AVATAR_STORAGE=s3 requires boto3, install the 's3' extra"
+            )
+        client = boto3.client(
+            "s3",
+            endpoint_url=settings.AVATAR_S3_ENDPOINT_URL,
+            region_name=settings.AVATAR_S3_REGION,
+            aws_access_key_id=settings.AVATAR_S3_ACCESS_KEY,
+            aws_secret_access_key=settings.AVATAR_S3_SECRET_KEY,
+        )
+        return S3AvatarStorage(
+            client, settings.AVATAR_S3_BUCKET, settings.AVATAR_S3_PUBLIC_URL
+        )
+    return CloudinaryAvatarStorage(
+        UploadFileService(
+            settings.CLOUDINARY_NAME,
+            settings.CLOUDINARY_API_KEY,
+            settings.CLOUDINARY_API_SECRET,
+        )
+    )
@@ -0,0 +1,78 @@
+import csv
+import io
+from typing import AsyncIterator
+
+from src.config.config import settings
+from src.database.db import sessionmanager
+from src.entity.models import User
+from src.repositories.contacts_repository import ContactRepository
+from src.schemas.contact_schema import ContactFileFormat, ContactResponse
+
+
+EXPORT_MEDIA_TYPES = {
+    ContactFileFormat.CSV: "text/csv",
+    ContactFileFormat.NDJSON: "application/x-ndjson",
+}
+EXPORT_FIELDS = list(ContactResponse.model_fields)
+
+
+class ContactExportService:
+    """Contact export service."""
+    def __init__(
+        self,
+        user: User,
+        file_format: ContactFileFormat,
+        use_primary: bool = False,
+    ):
+        self.user = user
+        self.file_format = file_format
+        self.use_primary = use_primary
+
+    @property
+    def media_type(self) -> str:
+        """Media type of the export."""
+        return EXPORT_MEDIA_TYPES[self.file_format]
+
+    @property
+    def filename(self) -> str:
+        """File name of the export."""
+        return f"contacts.{self.file_format.value}"
+
+    async def export(self) -> AsyncIterator[str]:
+        """
+        Yield the user's contacts, one serialized row at a time.
+
+        Runs in its own session: the response body is streamed after the
+        request dependencies, including their session, have been closed.
+        """
+        async with sessionmanager.read_session(self.use_primary) as db:
+            contacts = ContactRepository(db).stream_contacts(
+                self.user, settings.EXPORT_BATCH_SIZE
+            )
+            if self.file_format == ContactFileFormat.CSV:
+                async for chunk in self._csv(contacts):
+                    yield chunk
+            else:
+                async for chunk in self._ndjson(contacts):
+                    yield chunk
+
+    @staticmethod
+    async def _ndjson(contacts) -> AsyncIterator[str]:
+        """Serialize contacts as NDJSON."""
+        async for contact in contacts:
+            yield ContactResponse.model_validate(contact).model_dump_json() + "\n"
+
+    @staticmethod
+    async def _csv(contacts) -> AsyncIterator[str]:
+        """Serialize contacts as CSV with a header row."""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        yield buffer.getvalue()
+        async for contact in contacts:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(
+                ContactResponse.model_validate(contact).model_dump(mode="json")
+            )
+            yield buffer.getvalue()
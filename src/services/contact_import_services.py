@@ -0,0 +1,164 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import Iterator
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import messages
+from src.config.config import settings
+from src.entity.models import User
+from src.repositories.contacts_repository import ContactRepository
+from src.schemas.contact_schema import (
+    ContactFileFormat,
+    ContactImportError,
+    ContactImportReport,
+    ContactSchema,
+)
+
+
+CSV_CONTENT_TYPES = ("text/csv", "application/csv")
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl")
+
+
+def detect_format(
+    file: UploadFile, file_format: ContactFileFormat | None
+) -> ContactFileFormat:
+    """Detect the upload format from the query, file name or content type."""
+    if file_format is not None:
+        return file_format
+    filename = (file.filename or "").lower()
+    if filename.endswith(".csv") or file.content_type in CSV_CONTENT_TYPES:
+        return ContactFileFormat.CSV
+    if (
+        filename.endswith((".ndjson", ".jsonl"))
+        or file.content_type in NDJSON_CONTENT_TYPES
+    ):
+        return ContactFileFormat.NDJSON
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail=messages.contact_unsupported_format.get("en"),
+    )
+
+
+def iter_csv_rows(stream: io.TextIOBase) -> Iterator[tuple[int, dict | None]]:
+    """Yield (row number, row) pairs; empty cells become None."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, {
+            key: value if value != "" else None
+            for key, value in row.items()
+            if key is not None
+        }
+
+
+def iter_ndjson_rows(stream: io.TextIOBase) -> Iterator[tuple[int, dict | None]]:
+    """Yield (line number, row) pairs; undecodable lines yield None."""
+    for line_num, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_num, row if isinstance(row, dict) else None
+
+
+class ContactImportService:
+    """Contact import service."""
+    def __init__(self, db: AsyncSession):
+        self.contact_repository = ContactRepository(db)
+
+    async def import_contacts(
+        self,
+        file: UploadFile,
+        file_format: ContactFileFormat | None,
+        user: User,
+    ) -> ContactImportReport:
+        """
+        Import contacts from a CSV or NDJSON upload.
+
+        The upload is parsed incrementally: only one batch of
+        IMPORT_BATCH_SIZE rows is held in memory, validated with
+        ContactSchema and written with a single multi-row INSERT.
+
+        A file that cannot be decoded or parsed is rejected with 400; if
+        that happens after some batches were imported, the import stops
+        and the report's ``error`` says why.
+        """
+        file_format = detect_format(file, file_format)
+        stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+        rows = (
+            iter_csv_rows(stream)
+            if file_format == ContactFileFormat.CSV
+            else iter_ndjson_rows(stream)
+        )
+        report = ContactImportReport()
+        try:
+            while batch := await run_in_threadpool(
+                lambda: list(islice(rows, settings.IMPORT_BATCH_SIZE))
+            ):
+                await self._import_batch(batch, user, report)
+        except (UnicodeDecodeError, csv.Error) as e:
+            detail = f"{messages.contact_import_unreadable.get('en')}: {e}"
+            if report.total == 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail=detail
+                )
+            report.error = detail
+        finally:
+            stream.detach()
+        return report
+
+    async def _import_batch(
+        self,
+        batch: list[tuple[int, dict | None]],
+        user: User,
+        report: ContactImportReport,
+    ) -> None:
+        """Validate and insert one batch of rows."""
+        valid: list[tuple[int, dict]] = []
+        for row_num, row in batch:
+            report.total += 1
+            if row is None:
+                report.failed += 1
+                self._add_error(
+                    report, row_num, [messages.contact_import_invalid_row.get("en")]
+                )
+                continue
+            try:
+                contact = ContactSchema.model_validate(row)
+            except ValidationError as e:
+                report.failed += 1
+                errors = [
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+                    for err in e.errors()
+                ]
+                self._add_error(report, row_num, errors)
+                continue
+            valid.append((row_num, contact.model_dump()))
+
+        inserted = set(
+            await self.contact_repository.create_contacts_bulk(
+                [data for _, data in valid], user
+            )
+        )
+        for row_num, data in valid:
+            if data["email"] in inserted:
+                inserted.discard(data["email"])
+                report.created += 1
+            else:
+                report.skipped += 1
+                self._add_error(report, row_num, [messages.contact_exists.get("en")])
+
+    @staticmethod
+    def _add_error(
+        report: ContactImportReport, row_num: int, errors: list[str]
+    ) -> None:
+        """Record row errors, keeping at most IMPORT_MAX_ERRORS entries."""
+        if len(report.errors) < settings.IMPORT_MAX_ERRORS:
+            report.errors.append(ContactImportError(row=row_num, errors=errors))
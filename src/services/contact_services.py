@@ -1,6 +1,9 @@
 from datetime import date, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config.config import settings
+from src.core.etag import contact_etag
+from src.core.pagination import decode_cursor, encode_cursor
 from src.repositories.contacts_repository import ContactRepository
 from src.schemas.contact_schema import ContactSchema, ContactUpdateSchema
 from src.entity.models import User
@@ -11,32 +14,74 @@ class ContactService:
     def __init__(self, db: AsyncSession):
         self.contact_repository = ContactRepository(db)
 
-    async def get_contacts(self, limit: int, offset: int, user: User):
-        """Get a list of contacts."""
-        return await self.contact_repository.get_contacts(limit, offset, user)
+    async def get_contacts(
+        self, limit: int, offset: int, user: User, after: str | None = None
+    ):
+        """
+        Get a page of contacts and the cursor of the next page.
+
+        One contact more than the page is fetched, so a cursor is only
+        returned when another page really follows.
+        """
+        after_id = decode_cursor(after) if after is not None else None
+        contacts = await self.contact_repository.get_contacts(
+            limit + 1, offset, user, after_id
+        )
+        has_next = len(contacts) > limit
+        contacts = contacts[:limit]
+        next_cursor = encode_cursor(contacts[-1].id) if has_next else None
+        return contacts, next_cursor
 
     async def get_contact(self, contact_id: int, user: User):
         """Get a contact by ID."""
         return await self.contact_repository.get_contact_by_id(contact_id, user)
 
+    async def get_contact_etag(self, contact_id: int, user: User) -> str | None:
+        """ETag of a contact, without loading it."""
+        version = await self.contact_repository.get_contact_version(
+            contact_id, user
+        )
+        return contact_etag(*version) if version is not None else None
+
     async def create_contact(self, body: ContactSchema, user: User):
         """Create a new contact."""
         return await self.contact_repository.create_contact(body, user)
 
-    async def remove_contact(self, contact_id: int, user: User):
+    async def remove_contact(
+        self, contact_id: int, user: User, if_match: str | None = None
+    ):
         """Remove a contact by ID."""
-        return await self.contact_repository.remove_contact(contact_id, user)
+        return await self.contact_repository.remove_contact(
+            contact_id, user, if_match
+        )
 
-    async def update_contact(self, contact_id: int, body: ContactUpdateSchema, user: User):
+    async def update_contact(
+        self,
+        contact_id: int,
+        body: ContactUpdateSchema,
+        user: User,
+        if_match: str | None = None,
+    ):
         """Update a contact by ID."""
-        return await self.contact_repository.update_contact(contact_id, body, user)
+        return await self.contact_repository.update_contact(
+            contact_id, body, user, if_match
+        )
 
-    async def search_contacts(self, query: str, user: User):
-        """Search for contacts by query."""
-        return await self.contact_repository.search_contacts(query, user)
+    async def search_contacts(
+        self, query: str, user: User, limit: int, offset: int
+    ):
+        """Search for contacts by query, capped at SEARCH_MAX_RESULTS."""
+        limit = min(limit, settings.SEARCH_MAX_RESULTS - offset)
+        if limit <= 0:
+            return []
+        return await self.contact_repository.search_contacts(
+            query, user, limit, offset
+        )
 
-    async def upcoming_birthdays(self, user: User):
-        """Get contacts with upcoming birthdays."""
+    async def upcoming_birthdays(
+        self, user: User, days: int = settings.BIRTHDAY_WINDOW_DAYS
+    ):
+        """Get contacts with birthdays from today through today + ``days``."""
         today = date.today()
-        end_date = today + timedelta(days=7)
+        end_date = today + timedelta(days=days)
         return await self.contact_repository.get_contacts_with_birthdays(today, end_date, user)
\ No newline at end of file
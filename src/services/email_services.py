@@ -1,43 +1,408 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import time
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from email.utils import formataddr
 from pathlib import Path
+from uuid import uuid4
 
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
+import aiosmtplib
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 from pydantic import EmailStr
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
 from src.config.config import settings
 from src.core.email_token import create_email_token
+from src.database.redis_client import redis_client
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=settings.USE_CREDENTIALS,
-    VALIDATE_CERTS=settings.VALIDATE_CERTS,
-    TEMPLATE_FOLDER=Path(__file__).parent / "templates",
+
+logger = logging.getLogger("uvicorn.error")
+
+TEMPLATE_FOLDER = Path(__file__).parent / "templates"
+
+# Compiled templates stay in the environment's cache; with auto_reload off
+# a cached template is used without checking the file again.
+templates = Environment(
+    loader=FileSystemLoader(TEMPLATE_FOLDER),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
 )
 
+# Moves retries that are due back to the queue.
+# KEYS: retry set, queue. ARGV: now, max number of messages to move.
+PROMOTE_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, message in ipairs(due) do
+    redis.call('LPUSH', KEYS[2], message)
+    redis.call('ZREM', KEYS[1], message)
+end
+return #due
+"""
 
-async def send_email(email: EmailStr, username: str, host: str):
-    """Send email."""
-    try:
-        token_verification = create_email_token({"sub": email})
-        message = MessageSchema(
-            subject="Confirm your email",
-            recipients=[email],
-            template_body={
-                "host": host,
-                "username": username,
-                "token": token_verification,
-            },
-            subtype=MessageType.html,
+
+class SMTPPool:
+    """
+    Fixed-size pool of persistent SMTP connections.
+
+    Connections are opened on first use and reused between messages. A
+    connection that failed or sat idle for longer than idle_timeout is
+    closed and replaced on its next use.
+    """
+    def __init__(self, size: int, idle_timeout: float, **options):
+        self.options = options
+        self.idle_timeout = idle_timeout
+        self._idle: asyncio.LifoQueue[tuple[aiosmtplib.SMTP | None, float]] = (
+            asyncio.LifoQueue()
+        )
+        for _ in range(size):
+            self._idle.put_nowait((None, 0.0))
+
+    @asynccontextmanager
+    async def connection(self):
+        """Borrow a connected SMTP client."""
+        smtp, last_used = await self._idle.get()
+        try:
+            if smtp is not None and (
+                not smtp.is_connected
+                or time.monotonic() - last_used > self.idle_timeout
+            ):
+                await self._close(smtp)
+                smtp = None
+            if smtp is None:
+                smtp = aiosmtplib.SMTP(**self.options)
+                await smtp.connect()
+            yield smtp
+        except BaseException:
+            await self._close(smtp)
+            smtp = None
+            raise
+        finally:
+            self._idle.put_nowait((smtp, time.monotonic()))
+
+    async def close(self) -> None:
+        """Close all idle connections."""
+        connections = []
+        while not self._idle.empty():
+            connections.append(self._idle.get_nowait())
+        for smtp, _ in connections:
+            await self._close(smtp)
+            self._idle.put_nowait((None, 0.0))
+
+    @staticmethod
+    async def _close(smtp: aiosmtplib.SMTP | None) -> None:
+        if smtp is None or not smtp.is_connected:
+            return
+        try:
+            await smtp.quit()
+        except (aiosmtplib.SMTPException, OSError):
+            smtp.close()
+
+
+class EmailQueue:
+    """
+    Durable outgoing email queue in Redis.
+
+    Consumers move messages into their own processing list while sending,
+    so messages held by a consumer that stopped sending its heartbeat are
+    put back on the queue. Failed messages wait in a sorted set scored by
+    the time of the next attempt and end up in the dead letter list after
+    max_attempts.
+    """
+    queue_key = "email:queue"
+    retry_key = "email:retry"
+    dead_key = "email:dead"
+    processing_prefix = "email:processing:"
+    consumer_prefix = "email:consumer:"
+
+    def __init__(
+        self,
+        redis: Redis,
+        max_attempts: int,
+        retry_base: float,
+        retry_max: float,
+    ):
+        self.redis = redis
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._promote_due = redis.register_script(PROMOTE_DUE_SCRIPT)
+
+    async def enqueue(
+        self, recipient: str, subject: str, template: str, context: dict
+    ) -> str:
+        """Queue a message rendered from a template; returns its id."""
+        message_id = uuid4().hex
+        await self.redis.lpush(
+            self.queue_key,
+            json.dumps(
+                {
+                    "id": message_id,
+                    "to": recipient,
+                    "subject": subject,
+                    "template": template,
+                    "context": context,
+                    "attempts": 0,
+                }
+            ),
+        )
+        return message_id
+
+    async def take(
+        self, consumer: str, batch_size: int, timeout: float
+    ) -> list[bytes]:
+        """Move up to batch_size messages to the consumer's processing list."""
+        processing = f"{self.processing_prefix}{consumer}"
+        first = await self.redis.blmove(
+            self.queue_key, processing, timeout, "RIGHT", "LEFT"
+        )
+        if first is None:
+            return []
+        pipe = self.redis.pipeline(transaction=False)
+        for _ in range(batch_size - 1):
+            pipe.lmove(self.queue_key, processing, "RIGHT", "LEFT")
+        return [first, *(raw for raw in await pipe.execute() if raw is not None)]
+
+    async def ack(self, consumer: str, raw: bytes) -> None:
+        """Drop a sent message from the processing list."""
+        await self.redis.lrem(f"{self.processing_prefix}{consumer}", 1, raw)
+
+    async def fail(self, consumer: str, raw: bytes, error: str) -> None:
+        """Schedule a retry with exponential backoff, or dead-letter the message."""
+        message = json.loads(raw)
+        message["attempts"] += 1
+        message["error"] = error
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.lrem(f"{self.processing_prefix}{consumer}", 1, raw)
+        if message["attempts"] >= self.max_attempts:
+            pipe.lpush(self.dead_key, json.dumps(message))
+        else:
+            delay = min(
+                self.retry_base * 2 ** (message["attempts"] - 1), self.retry_max
+            )
+            due = time.time() + delay * random.uniform(0.5, 1.0)
+            pipe.zadd(self.retry_key, {json.dumps(message): due})
+        await pipe.execute()
+
+    async def promote_due(self, limit: int = 100) -> int:
+        """Move retries that are due back to the queue."""
+        return await self._promote_due(
+            keys=[self.retry_key, self.queue_key], args=[time.time(), limit]
+        )
+
+    async def heartbeat(self, consumer: str, ttl: int) -> None:
+        """Mark the consumer as alive for ttl seconds."""
+        await self.redis.set(f"{self.consumer_prefix}{consumer}", 1, ex=ttl)
+
+    async def requeue(self, consumer: str) -> int:
+        """Put the consumer's in-flight messages back at the head of the queue."""
+        processing = f"{self.processing_prefix}{consumer}"
+        moved = 0
+        while await self.redis.lmove(processing, self.queue_key, "RIGHT", "RIGHT"):
+            moved += 1
+        return moved
+
+    async def requeue_orphans(self) -> int:
+        """Requeue the in-flight messages of consumers that stopped."""
+        moved = 0
+        async for key in self.redis.scan_iter(match=f"{self.processing_prefix}*"):
+            consumer = key.decode()[len(self.processing_prefix):]
+            if not await self.redis.exists(f"{self.consumer_prefix}{consumer}"):
+                moved += await self.requeue(consumer)
+        return moved
+
+
+class EmailDispatcher:
+    """Sends queued emails in batches over pooled SMTP connections."""
+    def __init__(
+        self,
+        queue: EmailQueue,
+        pool: SMTPPool,
+        batch_size: int,
+        heartbeat_ttl: int = 30,
+    ):
+        self.queue = queue
+        self.pool = pool
+        self.batch_size = batch_size
+        self.heartbeat_ttl = heartbeat_ttl
+        self.consumer = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Start dispatching in the background."""
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop dispatching and hand unsent messages back to the queue."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.queue.requeue(self.consumer)
+        await self.pool.close()
+
+    async def run(self) -> None:
+        """Dispatch loop."""
+        heartbeat = asyncio.create_task(self._heartbeat())
+        next_maintenance = 0.0
+        try:
+            while True:
+                try:
+                    if time.monotonic() >= next_maintenance:
+                        await self.queue.requeue_orphans()
+                        next_maintenance = (
+                            time.monotonic() + self.heartbeat_ttl / 3
+                        )
+                    await self.queue.promote_due()
+                    batch = await self.queue.take(self.consumer, self.batch_size, 1)
+                    await asyncio.gather(*(self._deliver(raw) for raw in batch))
+                except RedisError as e:
+                    logger.warning(f"Email queue unavailable: {e}")
+                    await asyncio.sleep(1)
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+    async def _heartbeat(self) -> None:
+        """
+        Keep the consumer marked alive, also while a batch is being sent.
+
+        Runs apart from the dispatch loop, so a slow batch never lets the
+        heartbeat expire and have its messages requeued by other consumers.
+        """
+        while True:
+            try:
+                await self.queue.heartbeat(self.consumer, self.heartbeat_ttl)
+            except RedisError as e:
+                logger.warning(f"Email consumer heartbeat failed: {e}")
+            await asyncio.sleep(self.heartbeat_ttl / 3)
+
+    async def _deliver(self, raw: bytes) -> None:
+        """Send one queued message and settle it in the queue."""
+        try:
+            message = self.build_message(json.loads(raw))
+            async with self.pool.connection() as smtp:
+                await smtp.send_message(message)
+        except Exception as e:
+            logger.warning(f"Email delivery failed: {e}")
+            await self.queue.fail(self.consumer, raw, str(e))
+        else:
+            await self.queue.ack(self.consumer, raw)
+
+    @staticmethod
+    def build_message(data: dict) -> EmailMessage:
+        """Render a queued message."""
+        message = EmailMessage()
+        message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+        message["To"] = data["to"]
+        message["Subject"] = data["subject"]
+        message.set_content(
+            templates.get_template(data["template"]).render(data["context"]),
+            subtype="html",
         )
+        return message
+
+
+email_queue = EmailQueue(
+    redis_client,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    retry_base=settings.EMAIL_RETRY_BASE_SECONDS,
+    retry_max=settings.EMAIL_RETRY_MAX_SECONDS,
+)
+
+email_dispatcher = EmailDispatcher(
+    email_queue,
+    SMTPPool(
+        settings.EMAIL_SMTP_POOL_SIZE,
+        idle_timeout=settings.EMAIL_SMTP_IDLE_TIMEOUT,
+        hostname=settings.MAIL_SERVER,
+        port=settings.MAIL_PORT,
+        username=settings.MAIL_USERNAME if settings.USE_CREDENTIALS else None,
+        password=settings.MAIL_PASSWORD if settings.USE_CREDENTIALS else None,
+        use_tls=settings.MAIL_SSL_TLS,
+        start_tls=settings.MAIL_STARTTLS,
+        validate_certs=settings.VALIDATE_CERTS,
+        timeout=settings.EMAIL_SMTP_TIMEOUT,
+    ),
+    batch_size=settings.EMAIL_BATCH_SIZE,
+)
+
+
+class VerificationEmails:
+    """
+    Deduplicates verification email requests per address.
+
+    A request opens a cooldown window; repeats inside it are answered from
+    Redis alone, without touching the database or signing a token. The
+    token that was sent is cached and reused by later emails.
+    """
+    prefix = "email:verify:"
+
+    def __init__(self, redis: Redis, cooldown: int, token_ttl: int):
+        self.redis = redis
+        self.cooldown = cooldown
+        self.token_ttl = token_ttl
+
+    def _key(self, kind: str, email: str) -> str:
+        return f"{self.prefix}{kind}:{email.lower()}"
+
+    async def reserve(self, email: str) -> tuple[bool, int, str | None]:
+        """
+        Start the cooldown for an address in one round trip.
+
+        Returns whether this request opened the window, the seconds left in
+        it and the cached token, if any.
+        """
+        cooldown_key = self._key("cooldown", email)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.set(cooldown_key, 1, nx=True, ex=self.cooldown)
+        pipe.ttl(cooldown_key)
+        pipe.get(self._key("token", email))
+        reserved, remaining, token = await pipe.execute()
+        return bool(reserved), max(remaining, 0), token.decode() if token else None
+
+    async def token(self, email: str, cached: str | None = None) -> str:
+        """Cached verification token for the address, or a new one."""
+        if cached is not None:
+            return cached
+        token = create_email_token({"sub": email})
+        await self.redis.set(self._key("token", email), token, ex=self.token_ttl)
+        return token
+
+
+verification_emails = VerificationEmails(
+    redis_client,
+    cooldown=settings.EMAIL_VERIFY_COOLDOWN_SECONDS,
+    token_ttl=settings.EMAIL_VERIFY_TOKEN_CACHE_SECONDS,
+)
+
+
+async def send_email(
+    email: EmailStr, username: str, host: str, token: str | None = None
+):
+    """Queue the email verification message."""
+    token_verification = token or create_email_token({"sub": email})
+    await email_queue.enqueue(
+        str(email),
+        "Confirm your email",
+        "verify_email.html",
+        {"host": host, "username": username, "token": token_verification},
+    )
+
+
+async def run_worker() -> None:
+    """Run the dispatcher as a standalone process."""
+    try:
+        await email_dispatcher.run()
+    finally:
+        await email_dispatcher.stop()
+
 
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="verify_email.html")
-    except ConnectionErrors as err:
-        print(err)
\ No newline at end of file
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker())
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from redis.exceptions import LockError
+
+from src.config.config import settings
+from src.database.db import sessionmanager
+from src.database.redis_client import redis_client
+from src.repositories.refresh_token_repository import RefreshTokenRepository
+
+
+logger = logging.getLogger("uvicorn.error")
+
+CLEANUP_LOCK_NAME = "lock:cleanup_expired_tokens"
+
+
+async def cleanup_expired_tokens() -> dict | None:
+    """
+    Drop expired refresh token partitions and sweep the remaining rows.
+
+    Weekly partitions whose tokens have all expired are detached and
+    dropped, and partitions for the coming weeks are created. Expired rows
+    left in the current week or the default partition are then deleted in
+    bounded batches, each its own short transaction.
+
+    Only the worker holding the Redis lock runs the cleanup. Returns the
+    run report, or None when another worker holds the lock.
+    """
+    lock = redis_client.lock(
+        CLEANUP_LOCK_NAME,
+        timeout=settings.TOKEN_CLEANUP_LOCK_TIMEOUT,
+        blocking=False,
+    )
+    if not await lock.acquire():
+        logger.info("Expired tokens cleanup skipped: running on another worker")
+        return None
+
+    start = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=7)
+    deleted = 0
+    batches = 0
+    try:
+        async with sessionmanager.session() as db:
+            repository = RefreshTokenRepository(db)
+            dropped = await repository.drop_expired_partitions(now)
+            created = await repository.ensure_partitions(
+                now, settings.TOKEN_PARTITION_WEEKS_AHEAD
+            )
+            while True:
+                count = await repository.delete_expired_batch(
+                    now, cutoff, settings.TOKEN_CLEANUP_BATCH_SIZE
+                )
+                deleted += count
+                batches += 1
+                if count < settings.TOKEN_CLEANUP_BATCH_SIZE:
+                    break
+                await lock.reacquire()
+                await asyncio.sleep(settings.TOKEN_CLEANUP_PAUSE_SECONDS)
+    finally:
+        try:
+            await lock.release()
+        except LockError:
+            pass
+
+    report = {
+        "partitions_dropped": dropped,
+        "partitions_created": created,
+        "deleted": deleted,
+        "batches": batches,
+        "duration_seconds": round(time.perf_counter() - start, 3),
+    }
+    logger.info(
+        f"Expired tokens cleaned up at [{now.strftime('%Y-%m-%d %H:%M:%S')}]: "
+        f"{len(dropped)} partitions dropped, {len(created)} created, "
+        f"{report['deleted']} rows in {report['batches']} batches, "
+        f"{report['duration_seconds']}s"
+    )
+    return report
@@ -1,4 +1,8 @@
+import io
+
 import cloudinary
+import cloudinary.api
+import cloudinary.exceptions
 import cloudinary.uploader
 
 
@@ -16,15 +20,22 @@ class UploadFileService:
         )
 
     @staticmethod
-    def upload_file(file, username) -> str:
-        """Upload file."""
-        public_id = f"RestApp/{username}"
-        r = cloudinary.uploader.upload(
-            file.file, 
-            public_id=public_id, 
-            overwrite=True
-            )
-        src_url = cloudinary.CloudinaryImage(public_id).build_url(
-            width=250, height=250, crop="fill", version=r.get("version")
+    def upload_bytes(data: bytes, public_id: str) -> None:
+        """Upload an already processed image, keeping an existing one."""
+        cloudinary.uploader.upload(
+            io.BytesIO(data), public_id=public_id, overwrite=False
         )
-        return src_url
\ No newline at end of file
+
+    @staticmethod
+    def exists(public_id: str) -> bool:
+        """Whether an image is uploaded under public_id (Admin API)."""
+        try:
+            cloudinary.api.resource(public_id)
+        except cloudinary.exceptions.NotFound:
+            return False
+        return True
+
+    @staticmethod
+    def build_url(public_id: str) -> str:
+        """Delivery URL of an uploaded image."""
+        return cloudinary.CloudinaryImage(public_id).build_url(format="webp")
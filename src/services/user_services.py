@@ -1,11 +1,20 @@
+import logging
+
+from requests import RequestException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.gravatar import gravatar_checker, gravatar_url
+from src.database.db import sessionmanager
+
 from src.entity.models import User
 from src.repositories.user_repository import UserRepository 
 from src.schemas.user_schema import UserCreate
 from src.services.auth_services import AuthService
 
 
+logger = logging.getLogger("uvicorn.error")
+
+
 class UserService:
     """User service."""
     def __init__(self, db: AsyncSession):
@@ -35,4 +44,17 @@ class UserService:
 
     async def update_avatar_url(self, email: str, url: str):
         """Update avatar URL"""
-        return await self.user_repository.update_avatar_url(email, url)
\ No newline at end of file
+        return await self.user_repository.update_avatar_url(email, url)
+
+
+async def resolve_gravatar(email: str) -> None:
+    """Store the user's Gravatar URL if Gravatar has an image for the email."""
+    try:
+        found = await gravatar_checker.exists(email)
+    except RequestException as e:
+        logger.warning(f"Gravatar lookup failed: {e}")
+        return
+    if not found:
+        return
+    async with sessionmanager.session() as db:
+        await UserRepository(db).set_default_avatar_url(email, gravatar_url(email))
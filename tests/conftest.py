@@ -0,0 +1,77 @@
+import os
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+
+# Settings are read at import time, so the required ones get test values
+# before any src module is imported.
+TEST_ENV = {
+    "POSTGRES_DB": "contacts_test",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "postgres",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "15",
+    "REFRESH_TOKEN_EXPIRE_DAYS": "7",
+    "ALGORITHM": "HS256",
+    "SECRET_KEY": "test-secret",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "MAIL_USERNAME": "sender@example.com",
+    "MAIL_PASSWORD": "secret",
+    "MAIL_FROM": "sender@example.com",
+    "MAIL_PORT": "587",
+    "MAIL_SERVER": "localhost",
+    "MAIL_FROM_NAME": "Contacts API",
+    "MAIL_STARTTLS": "false",
+    "MAIL_SSL_TLS": "false",
+    "USE_CREDENTIALS": "false",
+    "VALIDATE_CERTS": "false",
+    "CLOUDINARY_NAME": "test",
+    "CLOUDINARY_API_KEY": "test",
+    "CLOUDINARY_API_SECRET": "test",
+}
+
+for name, value in TEST_ENV.items():
+    os.environ.setdefault(name, value)
+
+
+# birthday_mmdd is computed by Postgres; here it is a plain column filled in
+# by the test, which is all the repository query reads.
+CONTACTS_TABLE = """
+CREATE TABLE contacts (
+    id INTEGER PRIMARY KEY,
+    first_name VARCHAR(16) NOT NULL,
+    last_name VARCHAR(16) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    phone VARCHAR(15),
+    birthday DATE,
+    birthday_mmdd INTEGER,
+    additional_info VARCHAR(255),
+    created_at DATETIME,
+    updated_at DATETIME,
+    user_id INTEGER
+)
+"""
+
+
+@pytest.fixture
+async def db():
+    """Session on an in-memory SQLite database with a contacts table."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.execute(text(CONTACTS_TABLE))
+    async with async_sessionmaker(engine)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+async def redis():
+    """In-memory Redis with Lua scripting."""
+    client = FakeAsyncRedis()
+    yield client
+    await client.flushall()
+    await client.aclose()
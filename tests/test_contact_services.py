@@ -0,0 +1,40 @@
+from sqlalchemy import text
+
+from src.entity.models import User
+from src.services.contact_services import ContactService
+
+
+async def add_contacts(db, user_id: int, count: int) -> None:
+    await db.execute(
+        text(
+            "INSERT INTO contacts (first_name, last_name, email, user_id) "
+            "VALUES (:name, :name, :email, :user_id)"
+        ),
+        [
+            {"name": f"c{n}", "email": f"c{n}@example.com", "user_id": user_id}
+            for n in range(count)
+        ],
+    )
+    await db.commit()
+
+
+async def test_cursor_pages_end_without_an_empty_page(db):
+    await add_contacts(db, user_id=1, count=4)
+    service = ContactService(db)
+
+    first, cursor = await service.get_contacts(2, 0, User(id=1))
+    assert [contact.first_name for contact in first] == ["c0", "c1"]
+    assert cursor is not None
+
+    last, cursor = await service.get_contacts(2, 0, User(id=1), after=cursor)
+    assert [contact.first_name for contact in last] == ["c2", "c3"]
+    assert cursor is None
+
+
+async def test_partial_last_page_has_no_cursor(db):
+    await add_contacts(db, user_id=1, count=3)
+
+    contacts, cursor = await ContactService(db).get_contacts(5, 0, User(id=1))
+
+    assert len(contacts) == 3
+    assert cursor is None
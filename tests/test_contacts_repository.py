@@ -0,0 +1,70 @@
+from datetime import date
+
+from sqlalchemy import text
+
+from src.entity.models import User
+from src.repositories.contacts_repository import ContactRepository
+
+
+async def add_contacts(db, user_id: int, birthdays: dict[str, date]) -> None:
+    for name, birthday in birthdays.items():
+        await db.execute(
+            text(
+                "INSERT INTO contacts (first_name, last_name, email, birthday, "
+                "birthday_mmdd, user_id) VALUES (:name, :name, :email, "
+                ":birthday, :mmdd, :user_id)"
+            ),
+            {
+                "name": name,
+                "email": f"{name}@example.com",
+                "birthday": birthday.isoformat(),
+                "mmdd": birthday.month * 100 + birthday.day,
+                "user_id": user_id,
+            },
+        )
+    await db.commit()
+
+
+async def test_birthday_window_wraps_around_the_new_year(db):
+    await add_contacts(
+        db,
+        user_id=1,
+        birthdays={
+            "january2": date(1990, 1, 2),
+            "december30": date(1985, 12, 30),
+            "january4": date(2000, 1, 4),
+            "january5": date(1992, 1, 5),
+            "december27": date(1980, 12, 27),
+            "june": date(1995, 6, 15),
+        },
+    )
+    await add_contacts(db, user_id=2, birthdays={"other": date(1990, 12, 31)})
+
+    contacts = await ContactRepository(db).get_contacts_with_birthdays(
+        date(2026, 12, 28), date(2027, 1, 4), User(id=1)
+    )
+
+    assert [contact.first_name for contact in contacts] == [
+        "december30",
+        "january2",
+        "january4",
+    ]
+
+
+async def test_birthday_window_within_a_year(db):
+    await add_contacts(
+        db,
+        user_id=1,
+        birthdays={
+            "before": date(1990, 3, 9),
+            "first": date(1990, 3, 10),
+            "last": date(1990, 3, 17),
+            "after": date(1990, 3, 18),
+        },
+    )
+
+    contacts = await ContactRepository(db).get_contacts_with_birthdays(
+        date(2026, 3, 10), date(2026, 3, 17), User(id=1)
+    )
+
+    assert [contact.first_name for contact in contacts] == ["first", "last"]
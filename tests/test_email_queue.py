@@ -0,0 +1,51 @@
+import json
+
+from src.services.email_services import EmailDispatcher, EmailQueue, SMTPPool
+
+
+def make_dispatcher(queue: EmailQueue) -> EmailDispatcher:
+    return EmailDispatcher(queue, SMTPPool(1, idle_timeout=60), batch_size=10)
+
+
+async def test_crashed_consumer_messages_are_requeued_after_restart(
+    redis, monkeypatch
+):
+    # A restarted container keeps its hostname and usually PID 1.
+    monkeypatch.setattr("socket.gethostname", lambda: "worker")
+    monkeypatch.setattr("os.getpid", lambda: 1)
+    queue = EmailQueue(redis, max_attempts=3, retry_base=1, retry_max=10)
+    for n in range(3):
+        await queue.enqueue(f"user{n}@example.com", "Hi", "verify_email.html", {})
+
+    crashed = make_dispatcher(queue)
+    await queue.heartbeat(crashed.consumer, ttl=30)
+    taken = await queue.take(crashed.consumer, batch_size=10, timeout=1)
+    assert len(taken) == 3
+    assert await redis.llen(queue.queue_key) == 0
+
+    # The process dies: nothing is acked and its heartbeat runs out.
+    await redis.delete(f"{queue.consumer_prefix}{crashed.consumer}")
+
+    restarted = make_dispatcher(queue)
+    assert restarted.consumer != crashed.consumer
+    await queue.heartbeat(restarted.consumer, ttl=30)
+
+    assert await queue.requeue_orphans() == 3
+    assert await redis.llen(f"{queue.processing_prefix}{crashed.consumer}") == 0
+    requeued = await redis.lrange(queue.queue_key, 0, -1)
+    assert sorted(json.loads(raw)["to"] for raw in requeued) == [
+        "user0@example.com",
+        "user1@example.com",
+        "user2@example.com",
+    ]
+
+
+async def test_live_consumer_messages_stay_in_flight(redis):
+    queue = EmailQueue(redis, max_attempts=3, retry_base=1, retry_max=10)
+    await queue.enqueue("user@example.com", "Hi", "verify_email.html", {})
+    dispatcher = make_dispatcher(queue)
+    await queue.heartbeat(dispatcher.consumer, ttl=30)
+    await queue.take(dispatcher.consumer, batch_size=10, timeout=1)
+
+    assert await queue.requeue_orphans() == 0
+    assert await redis.llen(f"{queue.processing_prefix}{dispatcher.consumer}") == 1
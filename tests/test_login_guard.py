@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.core.login_guard import LoginGuard, SingleFlight
+
+
+def make_guard(redis) -> LoginGuard:
+    return LoginGuard(
+        redis,
+        max_user_failures=3,
+        max_ip_failures=100,
+        failure_window=60,
+        negative_ttl=60,
+    )
+
+
+async def test_user_is_locked_out_only_at_the_failing_address(redis):
+    guard = make_guard(redis)
+    for _ in range(3):
+        await guard.record_failure("alice", "10.0.0.1")
+
+    with pytest.raises(HTTPException) as error:
+        await guard.check("alice", "10.0.0.1")
+    assert error.value.status_code == 429
+    assert await guard.check("alice", "10.0.0.2") is False
+
+
+async def test_success_resets_the_address_counter(redis):
+    guard = make_guard(redis)
+    for _ in range(2):
+        await guard.record_failure("alice", "10.0.0.1")
+    await guard.record_success("alice", "10.0.0.1")
+    await guard.record_failure("alice", "10.0.0.1")
+
+    assert await guard.check("alice", "10.0.0.1") is False
+
+
+async def test_cancelled_caller_does_not_fail_the_shared_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def lookup():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "alice"
+
+    leader = asyncio.create_task(flight.do("alice", lookup))
+    follower = asyncio.create_task(flight.do("alice", lookup))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await follower == "alice"
+    assert leader.cancelled()
+    assert calls == 1
+
+
+async def test_shared_call_forwards_its_exception():
+    flight = SingleFlight()
+
+    async def lookup():
+        await asyncio.sleep(0)
+        raise LookupError("database unavailable")
+
+    results = await asyncio.gather(
+        flight.do("alice", lookup),
+        flight.do("alice", lookup),
+        return_exceptions=True,
+    )
+    assert [type(result) for result in results] == [LookupError, LookupError]
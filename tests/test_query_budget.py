@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import create_engine, event
+
+from src.core.query_budget import (
+    UNCOUNTED,
+    QueryBudgetExceeded,
+    QueryBudgetMiddleware,
+    _before_cursor_execute,
+    query_budget,
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    yield engine
+    engine.dispose()
+
+
+def route(engine, budget: int, statements: int, uncounted: int = 0):
+    """ASGI app that declares a budget and runs the given statements."""
+    async def app(scope, receive, send):
+        query_budget(budget)()
+        with engine.connect() as conn:
+            for _ in range(uncounted):
+                conn.exec_driver_sql(
+                    "SELECT 1", execution_options={UNCOUNTED: True}
+                )
+            for _ in range(statements):
+                conn.exec_driver_sql("SELECT 1")
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+    return app
+
+
+async def call(app) -> dict:
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/api/contacts/"}
+    await QueryBudgetMiddleware(app)(scope, receive, send)
+    return dict(messages[0]["headers"])
+
+
+async def test_route_within_budget_reports_its_statements(engine):
+    headers = await call(route(engine, budget=2, statements=2))
+
+    assert headers[b"x-query-count"] == b"2"
+
+
+async def test_statement_over_budget_raises(engine):
+    with pytest.raises(QueryBudgetExceeded, match="Query budget of 2 exceeded"):
+        await call(route(engine, budget=2, statements=3))
+
+
+async def test_uncounted_statements_do_not_use_the_budget(engine):
+    headers = await call(route(engine, budget=2, statements=2, uncounted=1))
+
+    assert headers[b"x-query-count"] == b"2"
@@ -0,0 +1,81 @@
+import pytest
+from fastapi import HTTPException
+
+from src.core.rate_limiter import RateLimiter, parse_rate
+
+
+# The start of a one minute window, in seconds.
+WINDOW_START = 60 * 28_000_000
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Settable time.time() of the rate limiter."""
+    now = [WINDOW_START]
+    monkeypatch.setattr("src.core.rate_limiter.time.time", lambda: now[0])
+    return now
+
+
+def test_parse_rate():
+    assert parse_rate("10/minute") == (10, 60)
+    assert parse_rate(" 5 / hours ") == (5, 3600)
+    with pytest.raises(ValueError):
+        parse_rate("10 per minute")
+
+
+async def test_request_over_the_limit_gets_429_with_retry_after(redis, clock):
+    limiter = RateLimiter(redis, {"contacts.list": "3/minute"})
+    for _ in range(3):
+        await limiter.hit("contacts.list", user_id=1)
+
+    with pytest.raises(HTTPException) as error:
+        await limiter.hit("contacts.list", user_id=1)
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "60"
+
+    # Other users have limits of their own.
+    await limiter.hit("contacts.list", user_id=2)
+
+
+async def test_previous_window_is_weighted_into_the_current_one(redis, clock):
+    limiter = RateLimiter(redis, {"contacts.list": "3/minute"})
+    for _ in range(3):
+        await limiter.hit("contacts.list", user_id=1)
+
+    # At the start of the next window the previous one still counts fully;
+    # after a third of it, one of its three requests has slid out.
+    clock[0] = WINDOW_START + 60
+    with pytest.raises(HTTPException) as error:
+        await limiter.hit("contacts.list", user_id=1)
+    assert error.value.headers["Retry-After"] == "20"
+
+    clock[0] = WINDOW_START + 80
+    await limiter.hit("contacts.list", user_id=1)
+    with pytest.raises(HTTPException):
+        await limiter.hit("contacts.list", user_id=1)
+
+
+async def test_rejected_requests_are_not_counted(redis, clock):
+    limiter = RateLimiter(redis, {"auth.login": "2/minute"})
+    for _ in range(2):
+        await limiter.hit("auth.login", ip_address="10.0.0.1")
+    for _ in range(5):
+        with pytest.raises(HTTPException):
+            await limiter.hit("auth.login", ip_address="10.0.0.1")
+
+    clock[0] = WINDOW_START + 120
+    await limiter.hit("auth.login", ip_address="10.0.0.1")
+
+
+async def test_revoked_token_is_reported_without_counting(redis, clock):
+    limiter = RateLimiter(redis, {"users.me": "1/minute"})
+    await redis.set("bl:revoked", 1)
+
+    assert await limiter.hit("users.me", user_id=1, revoked_key="bl:revoked")
+    assert not await limiter.hit("users.me", user_id=1, revoked_key="bl:active")
+
+
+async def test_unlimited_route_is_not_counted(redis, clock):
+    limiter = RateLimiter(redis, {"contacts.list": "1/minute"}, enabled=False)
+    for _ in range(3):
+        assert not await limiter.hit("contacts.list", user_id=1)
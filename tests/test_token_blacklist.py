@@ -0,0 +1,39 @@
+import math
+
+import pytest
+
+from src.core.token_blacklist import BloomFilter, TokenBlacklist
+
+
+@pytest.mark.parametrize("error_rate", [0.01, 0.001])
+def test_bloom_filter_is_sized_for_the_error_rate(error_rate):
+    bloom = BloomFilter(10_000, error_rate)
+
+    bits_per_item = -math.log(error_rate) / math.log(2) ** 2
+    assert bloom.size == math.ceil(10_000 * bits_per_item)
+    assert bloom.hash_count == round(bits_per_item * math.log(2))
+    assert len(bloom._bits) * 8 >= bloom.size
+
+
+@pytest.mark.parametrize("error_rate", [0.01, 0.001])
+def test_bloom_filter_has_no_false_negatives_and_keeps_its_error_rate(error_rate):
+    bloom = BloomFilter(10_000, error_rate)
+    members = [f"jti-{n}" for n in range(10_000)]
+    for member in members:
+        bloom.add(member)
+
+    assert all(member in bloom for member in members)
+    others = 100_000
+    false_positives = sum(f"other-{n}" in bloom for n in range(others))
+    assert false_positives / others <= error_rate * 1.5
+
+
+async def test_blacklist_only_asks_redis_when_the_filter_might_match(redis):
+    blacklist = TokenBlacklist(redis, capacity=1000, error_rate=0.001)
+    await blacklist.revoke("revoked", ttl=60)
+    await blacklist.rebuild()
+    blacklist.ready = True
+
+    assert await blacklist.is_revoked("revoked")
+    assert not blacklist.might_be_revoked("active")
+    assert not await blacklist.is_revoked("active")